@@ -0,0 +1,24 @@
+"""
+ASGI config for Sudoku Teacher project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Production runs it with uvicorn workers under gunicorn, so that the async
+board views do not hold a worker while a board is solved. Its handler also
+awaits async streaming responses, see sudoku_teacher.board.asgi.
+
+"""
+import os
+import sys
+from pathlib import Path
+
+import django
+
+ROOT_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(ROOT_DIR / "sudoku_teacher"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+django.setup(set_prefix=False)
+
+from sudoku_teacher.board.asgi import StreamingASGIHandler  # noqa: E402
+
+application = StreamingASGIHandler()
@@ -268,3 +268,23 @@ SOCIALACCOUNT_ADAPTER = "sudoku_teacher.users.adapters.SocialAccountAdapter"
 
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Board solver invariant checks: "off", "incremental" (only the cell touched by
+# each elimination) or "full" (sweep every cell after each rule).
+BOARD_SOLVER_CHECK_MODE = env("DJANGO_BOARD_SOLVER_CHECK_MODE", default="off")
+# Steps kept in the trace of a single solve, later steps are dropped.
+BOARD_SOLVER_MAX_TRACE_STEPS = env.int("DJANGO_BOARD_SOLVER_MAX_TRACE_STEPS", default=10000)
+# Cache alias and timeout, in seconds, of pre-serialized solve responses.
+BOARD_SOLVE_CACHE = env("DJANGO_BOARD_SOLVE_CACHE", default="default")
+BOARD_SOLVE_CACHE_TIMEOUT = env.int("DJANGO_BOARD_SOLVE_CACHE_TIMEOUT", default=604800)
+# Threads solving boards for the async views, and how many solves may wait for
+# them before new ones are turned away.
+BOARD_SOLVER_WORKERS = env.int("DJANGO_BOARD_SOLVER_WORKERS", default=2)
+BOARD_SOLVER_MAX_PENDING = env.int("DJANGO_BOARD_SOLVER_MAX_PENDING", default=32)
+# Worker processes of the solve service, 0 solves in the serving process, and
+# the seconds a job may take on them.
+BOARD_SOLVE_SERVICE_PROCESSES = env.int("DJANGO_BOARD_SOLVE_SERVICE_PROCESSES", default=0)
+BOARD_SOLVE_SERVICE_TIMEOUT = env.int("DJANGO_BOARD_SOLVE_SERVICE_TIMEOUT", default=10)
+# Seconds a budgeted solve request may run before answering with a cursor.
+BOARD_SOLVER_BUDGET_SECONDS = env.float("DJANGO_BOARD_SOLVER_BUDGET_SECONDS", default=0.25)
+# Library puzzles kept parsed in memory by every process.
+BOARD_LOADER_CACHE_SIZE = env.int("DJANGO_BOARD_LOADER_CACHE_SIZE", default=256)
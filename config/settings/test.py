@@ -39,3 +39,4 @@ EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
 # Your stuff...
 # ------------------------------------------------------------------------------
+BOARD_SOLVER_CHECK_MODE = "full"
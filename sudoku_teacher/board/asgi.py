@@ -0,0 +1,97 @@
+import asyncio
+
+from django.core.handlers.asgi import ASGIHandler, ASGIRequest
+from django.http import StreamingHttpResponse
+
+
+class AsyncStreamingHttpResponse(StreamingHttpResponse):
+    """A streaming response whose content is an async iterator of bytes.
+
+    Django 3.1 iterates streaming content synchronously, on the event loop
+    under ASGI. ``StreamingASGIHandler`` awaits this content instead, so
+    making it never blocks the loop.
+    """
+
+    def __init__(self, async_content, *args, **kwargs):
+        super().__init__((), *args, **kwargs)
+        self.async_streaming_content = async_content
+
+
+class StreamingASGIRequest(ASGIRequest):
+    # views may answer it with an AsyncStreamingHttpResponse
+    async_streaming = True
+
+
+class StreamingASGIHandler(ASGIHandler):
+    request_class = StreamingASGIRequest
+
+    async def __call__(self, scope, receive, send):
+        # Django 3.1 stops listening to the client once the body is read, so
+        # a request whose client went away would run to its end. It is
+        # cancelled here instead, and with it the solve it waits for.
+        if scope["type"] != "http":
+            return await super().__call__(scope, receive, send)
+        body_read = asyncio.Event()
+        response_sent = asyncio.Event()
+
+        async def receive_body():
+            message = await receive()
+            if message["type"] != "http.request" or not message.get("more_body"):
+                body_read.set()
+            return message
+
+        async def send_response(message):
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body"
+            ):
+                response_sent.set()
+
+        async def disconnected():
+            await body_read.wait()
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        handling = asyncio.ensure_future(
+            super().__call__(scope, receive_body, send_response)
+        )
+        watching = asyncio.ensure_future(disconnected())
+        try:
+            await asyncio.wait(
+                {handling, watching}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            watching.cancel()
+            # a finished response still gets closed
+            if not handling.done() and not response_sent.is_set():
+                handling.cancel()
+        await asyncio.wait({handling})
+        if not handling.cancelled():
+            handling.result()
+
+    async def send_response(self, response, send):
+        if not isinstance(response, AsyncStreamingHttpResponse):
+            return await super().send_response(response, send)
+        content = response.async_streaming_content
+
+        async def send_content(message):
+            # the parts go out right before the closing message, after the
+            # headers and the empty sync content
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body"
+            ):
+                async for part in content:
+                    for chunk, _ in self.chunk_bytes(part):
+                        await send(
+                            {
+                                "type": "http.response.body",
+                                "body": chunk,
+                                "more_body": True,
+                            }
+                        )
+            await send(message)
+
+        try:
+            await super().send_response(response, send_content)
+        finally:
+            await content.aclose()
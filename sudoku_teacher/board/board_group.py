@@ -1,100 +1,104 @@
-import itertools
-from collections import defaultdict
-from copy import deepcopy
-
-from django.contrib.sessions.backends.db import SessionStore
-
+from sudoku_teacher.board.candidates import (
+    MASK_TO_VALUES,
+    POPCOUNT,
+    VALUE_TO_BIT,
+    CandidateStore,
+)
 from sudoku_teacher.board.helper import (
-    PointsOptionsTreeNode,
+    MAX_SUBSET_SIZE,
+    Subset,
+    find_subsets,
     update_hidden,
-    OptionsPointsTreeNode,
     update_naked,
-    update_move,
-    session,
 )
+from sudoku_teacher.board.intersections import Intersections
+from sudoku_teacher.board.trace import NO_UNIT, SolveTrace
 
 
 class BoardGroup:
-    def __init__(self, points_to_options, name):
-        self.point_to_options = points_to_options
-        self.neighbors = {}
+    def __init__(
+        self,
+        candidates: CandidateStore,
+        cells,
+        name,
+        unit=NO_UNIT,
+        intersections: Intersections = None,
+        trace: SolveTrace = None,
+    ):
+        self.candidates = candidates
+        self.trace = trace if trace is not None else SolveTrace()
+        self.cells = tuple(cells)
         self.name = name
+        self.unit = unit
+        self.intersections = intersections
 
-    def add_neighbor(self, points, neighbor: "BoardGroup"):
-        if not points.subset(self.point_to_options.keys()):
-            return
-        self.neighbors[points] = neighbor
+    @property
+    def point_to_options(self):
+        return {
+            divmod(cell, 9): self.candidates.options(cell) for cell in self.cells
+        }
 
-    def handle_naked_subset(self):
-        options_to_points = defaultdict(set)
-        for point, options in self.point_to_options.items():
-            if not options:
-                continue
-            sorted_options = frozenset(options)
-            options_to_points[sorted_options].add(point)
-        roots = []
-        for option_subset in sorted(options_to_points, key=lambda x: (len(x), x)):
-            points_subset = options_to_points[option_subset]
-            node = OptionsPointsTreeNode(option_subset, points_subset)
-            found_root = any([root.add_child(node) for root in roots])
-            if not found_root:
-                roots.append(node)
-        for root in roots:
-            update_naked(root, self.point_to_options, self.name)
+    def get_options_to_points(self):
+        # Position masks of every value, leaving out settled cells: cells with
+        # a single option that appears nowhere else in the group. They cannot
+        # take part in a subset that eliminates anything.
+        masks = self.candidates.masks
+        options_to_points = [0] * 10
+        for pos, cell in enumerate(self.cells):
+            for value in MASK_TO_VALUES[masks[cell]]:
+                options_to_points[value] |= 1 << pos
+        for value in range(1, 10):
+            points = options_to_points[value]
+            if POPCOUNT[points] == 1:
+                cell = self.cells[points.bit_length() - 1]
+                if POPCOUNT[masks[cell]] == 1:
+                    options_to_points[value] = 0
+        return options_to_points
 
-    def handle_hidden_subset(self):
-        options_to_points = defaultdict(set)
-        for point, options in self.point_to_options.items():
-            for option in options:
-                options_to_points[option].add(point)
-        points_subset_to_option_subset = defaultdict(set)
-        for val, points in options_to_points.items():
-            key = frozenset(points)
-            points_subset_to_option_subset[key].add(val)
+    def naked_subsets(self, size=None):
+        """Naked subsets of the group, only those of size cells if given."""
+        masks = self.candidates.masks
+        open_points = 0
+        for value_points in self.get_options_to_points():
+            open_points |= value_points
+        items = [
+            (1 << pos, masks[cell])
+            for pos, cell in enumerate(self.cells)
+            if open_points >> pos & 1
+        ]
+        max_size = min(MAX_SUBSET_SIZE, len(items) - 1, size or MAX_SUBSET_SIZE)
+        return [
+            Subset(points, options)
+            for points, options in find_subsets(items, max_size)
+            if size is None or POPCOUNT[options] == size
+        ]
 
-        roots = []
-        for point_subset in sorted(
-            points_subset_to_option_subset, key=lambda x: (len(x), x)
-        ):
-            options_subset = points_subset_to_option_subset[point_subset]
-            node = PointsOptionsTreeNode(point_subset, options_subset)
-            found_root = any([root.add_child(node) for root in roots])
-            if not found_root:
-                roots.append(node)
-        for root in roots:
-            update_hidden(root, self.point_to_options, self.name)
+    def hidden_subsets(self, size=None):
+        """Hidden subsets of the group, only those of size values if given."""
+        options_to_points = self.get_options_to_points()
+        open_points = 0
+        items = []
+        for value, value_points in enumerate(options_to_points):
+            if value_points:
+                open_points |= value_points
+                items.append((VALUE_TO_BIT[value], value_points))
+        max_size = min(
+            MAX_SUBSET_SIZE, POPCOUNT[open_points] - 1, size or MAX_SUBSET_SIZE
+        )
+        return [
+            Subset(points, options)
+            for options, points in find_subsets(items, max_size)
+            if size is None or POPCOUNT[points] == size
+        ]
 
-    def handle_pointing_subset(self):
+    def handle_naked_subset(self):
+        for subset in self.naked_subsets():
+            update_naked(self.trace, subset, self.candidates, self.cells, self.unit)
 
-        for neighbor, group in self.neighbors.items():
-            values = set(
-                itertools.chain.from_iterable(
-                    [self.point_to_options[(i, j)] for i, j in neighbor]
-                )
-            )
-            other_neighbors = {n for n in self.neighbors if n != neighbor}
-            for other in other_neighbors:
-                other_values = set(
-                    itertools.chain.from_iterable(
-                        [self.point_to_options[(i, j)] for i, j in other]
-                    )
-                )
-                values.difference_update(other_values)
-            if values:
-                group.remove_except(values, neighbor, self.name)
+    def handle_hidden_subset(self):
+        for subset in self.hidden_subsets():
+            update_hidden(self.trace, subset, self.candidates, self.cells, self.unit)
 
-    def remove_except(self, values, neighbor, name):
-        for point, value in self.point_to_options.items():
-            if point in neighbor:
-                continue
-            orig_options = deepcopy(self.point_to_options[point])
-            self.point_to_options[point].difference_update(values)
-            update_move(
-                point=point,
-                node=None,
-                new_options=self.point_to_options[point],
-                orig_options=orig_options,
-                name=self.name,
-                reason="pointing",
-                neighbor=name,
-            )
+    def handle_pointing_subset(self):
+        if self.intersections is not None:
+            self.intersections.handle_unit(self.unit)
@@ -0,0 +1,125 @@
+# Cell and unit index tables, built once at import.
+#
+# Cells are numbered row * 9 + col. Units are numbered 0-8 for rows, 9-17 for
+# cols and 18-26 for squares, squares being numbered left to right, top to
+# bottom.
+
+ROW_UNIT = 0
+COL_UNIT = 9
+SQUARE_UNIT = 18
+
+CELLS = tuple(range(81))
+CELL_ROW = tuple(cell // 9 for cell in CELLS)
+CELL_COL = tuple(cell % 9 for cell in CELLS)
+CELL_SQUARE = tuple(cell // 27 * 3 + cell % 9 // 3 for cell in CELLS)
+CELL_POINT = tuple(divmod(cell, 9) for cell in CELLS)
+
+
+def cell_index(row, col):
+    return row * 9 + col
+
+
+SQUARE_START = tuple((idx // 3 * 3, idx % 3 * 3) for idx in range(9))
+
+ROWS = tuple(tuple(row * 9 + col for col in range(9)) for row in range(9))
+COLS = tuple(tuple(row * 9 + col for row in range(9)) for col in range(9))
+SQUARES = tuple(
+    tuple((row + i) * 9 + col + j for i in range(3) for j in range(3))
+    for row, col in SQUARE_START
+)
+UNITS = ROWS + COLS + SQUARES
+UNIT_NAMES = (
+    tuple(f"row-{row}" for row in range(9))
+    + tuple(f"col-{col}" for col in range(9))
+    + tuple(f"square-{row}-{col}" for row, col in SQUARE_START)
+)
+
+CELL_UNITS = tuple(
+    (
+        ROW_UNIT + CELL_ROW[cell],
+        COL_UNIT + CELL_COL[cell],
+        SQUARE_UNIT + CELL_SQUARE[cell],
+    )
+    for cell in CELLS
+)
+
+
+def _peers(cell):
+    row, col = CELL_POINT[cell]
+    peers = []
+    for i in range(9):
+        if i != row:
+            peers.append(i * 9 + col)
+        if i != col:
+            peers.append(row * 9 + i)
+    for other in SQUARES[CELL_SQUARE[cell]]:
+        if CELL_ROW[other] != row and CELL_COL[other] != col:
+            peers.append(other)
+    return tuple(peers)
+
+
+PEERS = tuple(_peers(cell) for cell in CELLS)
+
+
+def _intersections():
+    intersections = []
+    for idx, (row, col) in enumerate(SQUARE_START):
+        for i in range(3):
+            cells = tuple((row + i) * 9 + col + j for j in range(3))
+            intersections.append((SQUARE_UNIT + idx, ROW_UNIT + row + i, cells))
+            cells = tuple((row + j) * 9 + col + i for j in range(3))
+            intersections.append((SQUARE_UNIT + idx, COL_UNIT + col + i, cells))
+    return tuple(intersections)
+
+
+# (square unit, line unit, cells) for each of the 54 square/line intersections.
+INTERSECTIONS = _intersections()
+
+
+def _intersection_tables():
+    cell_intersections = [[] for _ in CELLS]
+    unit_intersections = [[] for _ in UNITS]
+    for idx, (square_unit, line_unit, cells) in enumerate(INTERSECTIONS):
+        for cell in cells:
+            cell_intersections[cell].append(idx)
+        unit_intersections[square_unit].append(idx)
+        unit_intersections[line_unit].append(idx)
+
+    line_siblings, square_siblings = [], []
+    for idx, (square_unit, line_unit, cells) in enumerate(INTERSECTIONS):
+        is_row = line_unit < COL_UNIT
+        line_siblings.append(
+            tuple(other for other in unit_intersections[line_unit] if other != idx)
+        )
+        square_siblings.append(
+            tuple(
+                other
+                for other in unit_intersections[square_unit]
+                if other != idx and (INTERSECTIONS[other][1] < COL_UNIT) == is_row
+            )
+        )
+    return (
+        tuple(map(tuple, cell_intersections)),
+        tuple(map(tuple, unit_intersections)),
+        tuple(line_siblings),
+        tuple(square_siblings),
+    )
+
+
+# Indices into INTERSECTIONS: the two intersections of each cell, the 3 or 6
+# intersections of each unit, and for each intersection the other two that
+# cover the rest of its line and the rest of its square.
+(
+    CELL_INTERSECTIONS,
+    UNIT_INTERSECTIONS,
+    INTERSECTION_LINE_SIBLINGS,
+    INTERSECTION_SQUARE_SIBLINGS,
+) = _intersection_tables()
+INTERSECTION_LINE_REST = tuple(
+    tuple(cell for cell in UNITS[line_unit] if cell not in cells)
+    for _, line_unit, cells in INTERSECTIONS
+)
+INTERSECTION_SQUARE_REST = tuple(
+    tuple(cell for cell in UNITS[square_unit] if cell not in cells)
+    for square_unit, _, cells in INTERSECTIONS
+)
@@ -1,27 +1,63 @@
-from copy import deepcopy
-from typing import List
+from typing import List, Optional
 
+from django.conf import settings
 from prettytable import PrettyTable
 
 from sudoku_teacher.board.board_group import BoardGroup
-from sudoku_teacher.board.helper import (
-    get_square_idx,
-    get_row_col_from_square_id,
-    get_square_points,
-    session_update_list,
-    get_relevant_points,
+from sudoku_teacher.board.board_index import (
+    CELL_POINT,
+    CELL_SQUARE,
+    CELL_UNITS,
+    COL_UNIT,
+    COLS,
+    PEERS,
+    ROW_UNIT,
+    ROWS,
+    SQUARE_UNIT,
+    SQUARES,
+    UNIT_NAMES,
 )
+from sudoku_teacher.board.budget import SolveBudget, SolveCursor
+from sudoku_teacher.board.candidates import (
+    CHECK_FULL,
+    CHECK_MODES,
+    CHECK_OFF,
+    POPCOUNT,
+    VALUE_TO_BIT,
+    CandidateStore,
+    Contradiction,
+)
+from sudoku_teacher.board.exact_cover import ExactCoverSolver
+from sudoku_teacher.board.intersections import Intersections
+from sudoku_teacher.board.propagation import Propagator
+from sudoku_teacher.board.tensor_engine import TensorBoardSolver
+from sudoku_teacher.board.trace import INITIAL, SolveTrace
 
 ALL_VALS = frozenset(range(1, 10))
+# Bump whenever a change to the rules changes the steps or results of a solve,
+# cached and stored results are keyed by it.
+# Grades depend on grading.TECHNIQUES and hints.apply_cheapest_step too, so
+# bump it when either changes.
+SOLVER_VERSION = 1
 
 
 class BoardSolver:
-    def __init__(self, board=None):
+    def __init__(self, board=None, check_mode=None, trace=None):
         if board is None:
             board = []
             for i in range(9):
                 board.append([0 for _ in range(9)])
+        if check_mode is None:
+            check_mode = getattr(settings, "BOARD_SOLVER_CHECK_MODE", CHECK_OFF)
+        if check_mode not in CHECK_MODES:
+            raise ValueError(f"unknown check mode {check_mode!r}")
         self.board = board
+        self.check_mode = check_mode
+        self.trace = trace if trace is not None else SolveTrace()
+        # resume point of iter_solve, and steps recorded before this solver
+        self.next_given = 0
+        self.trace_offset = 0
+        self.orig_options = None
         self.init_board_options()
         self.rows: List[BoardGroup] = [
             self.create_board_group_from_row(row) for row in range(9)
@@ -32,165 +68,165 @@ class BoardSolver:
         self.squares: List[BoardGroup] = [
             self.create_board_group_from_square_by_idx(idx) for idx in range(9)
         ]
-        self.update_board_group_neighbors()
+        self.units: List[BoardGroup] = self.rows + self.cols + self.squares
+        self.propagator = Propagator(
+            self.units,
+            check=self.assert_rules if self.check_mode == CHECK_FULL else None,
+            intersections=self.intersections,
+        )
+        self.candidates.listener = self.propagator.cell_changed
+
+    @classmethod
+    def resume(cls, cursor: SolveCursor, check_mode=None, trace=None):
+        """A solver picking up where the solve that made cursor stopped."""
+        if cursor.solver_version != SOLVER_VERSION:
+            raise ValueError(
+                f"cursor of solver version {cursor.solver_version}, "
+                f"this is version {SOLVER_VERSION}"
+            )
+        bs = cls(cursor.board, check_mode, trace)
+        bs.candidates.masks[:] = cursor.masks
+        bs.intersections.refresh_all()
+        bs.next_given = cursor.next_given
+        for unit in cursor.queue:
+            bs.propagator.mark_unit(unit)
+        bs.trace_offset = cursor.offset
+        return bs
 
     def options_for_debug(self):
         p = []
-        for row in self.options:
-            p.append([list(a) for a in row])
+        for i in range(9):
+            p.append([list(self.candidates.values(i * 9 + j)) for j in range(9)])
         return p
 
     def init_board_options(self):
-        self.options = []
-        for i in range(9):
-            row = []
-            for j in range(9):
-                val = set()
-                if self.board[i][j] == 0:
-                    val = set(ALL_VALS)
-                row.append(val)
-            self.options.append(row)
-
-    def update_board_group_neighbors(self):
-        for idx in range(9):
-            square_group = self.squares[idx]
-            row, col = get_row_col_from_square_id(idx)
-            for i in range(3):
-                row_group = self.rows[row + i]
-                sub_row = frozenset({(row + i, col + j) for j in range(3)})
-                row_group.neighbors[sub_row] = square_group
-                square_group.neighbors[sub_row] = row_group
-
-                col_group = self.cols[col + i]
-                sub_col = frozenset({(row + j, col + i) for j in range(3)})
-                col_group.neighbors[sub_col] = square_group
-                square_group.neighbors[sub_col] = col_group
+        self.candidates = CandidateStore.from_board(self.board)
+        self.candidates.check = self.check_mode != CHECK_OFF
+        self.intersections = Intersections(self.candidates, self.trace)
+        self._options = None
+
+    @property
+    def options(self):
+        if self._options is None:
+            self._options = [
+                [self.candidates.options(i * 9 + j) for j in range(9)]
+                for i in range(9)
+            ]
+        return self._options
 
     def handle_hidden_subset(self, row, col):
-        self.rows[row].handle_hidden_subset()
-        self.cols[col].handle_hidden_subset()
-        square_idx = get_square_idx(row, col)
-        self.squares[square_idx].handle_hidden_subset()
+        for unit in CELL_UNITS[row * 9 + col]:
+            self.units[unit].handle_hidden_subset()
 
     def handle_naked_subset(self, row, col):
-        self.rows[row].handle_naked_subset()
-        self.cols[col].handle_naked_subset()
-        square_idx = get_square_idx(row, col)
-        self.squares[square_idx].handle_naked_subset()
+        for unit in CELL_UNITS[row * 9 + col]:
+            self.units[unit].handle_naked_subset()
 
     def handle_pointing_subset(self, row, col):
-        self.rows[row].handle_pointing_subset()
-        self.cols[col].handle_pointing_subset()
-        square_idx = get_square_idx(row, col)
-        self.squares[square_idx].handle_pointing_subset()
+        for unit in CELL_UNITS[row * 9 + col]:
+            self.units[unit].handle_pointing_subset()
 
     def eliminate_options_according_to_board(self):
-        points = set()
         for i in range(9):
             for j in range(9):
                 if self.board[i][j] > 0:
                     self.update_board_options_according_to_value(i, j)
-                    self.assert_rules()
-                else:
-                    points.add((i, j))
+                    self.check_rules()
 
     def update_board_options_according_to_cell(self, row, col, val=0):
-        options = deepcopy(self.options)
-        self.assert_rules()
+        self.check_rules()
 
         self.update_board_options_according_to_value(row, col)
-        options1 = deepcopy(self.options[row][col])
-        self.assert_rules()
+        self.check_rules()
         self.update_board_options_according_to_row_group(row)
-        options2 = deepcopy(self.options[row][col])
-        self.assert_rules()
-        options = deepcopy(self.options)
+        self.check_rules()
 
         self.update_board_options_according_to_col_group(col)
-        self.assert_rules()
+        self.check_rules()
 
         self.update_board_options_according_to_square_group(row, col)
-        self.assert_rules()
+        self.check_rules()
+
+    def check_rules(self):
+        if self.check_mode == CHECK_FULL:
+            self.assert_rules()
 
     def assert_rules(self):
+        masks = self.candidates.masks
         for i in range(9):
             for j in range(9):
-                options = self.options[i][j]
-                value = self.board[i][j]
-                assert options or value > 0
-                if len(self.options[i][j]) == 1:
-                    assert self.board[i][j] == 0
+                options = masks[i * 9 + j]
+                if not options and self.board[i][j] == 0:
+                    raise Contradiction(i * 9 + j)
+                if options and self.board[i][j] > 0:
+                    raise Contradiction(i * 9 + j)
+
+    def create_board_group(self, unit, cells):
+        return BoardGroup(
+            self.candidates,
+            cells,
+            name=UNIT_NAMES[unit],
+            unit=unit,
+            intersections=self.intersections,
+            trace=self.trace,
+        )
 
     def create_board_group_from_row(self, row):
-        points_to_options = {(row, col): self.options[row][col] for col in range(9)}
-        return BoardGroup(points_to_options, name=f"row-{row}")
+        return self.create_board_group(ROW_UNIT + row, ROWS[row])
 
     def create_board_group_from_col(self, col):
-        points_to_options = {(row, col): self.options[row][col] for row in range(9)}
-        return BoardGroup(points_to_options, name=f"col-{col}")
+        return self.create_board_group(COL_UNIT + col, COLS[col])
 
     def create_board_group_from_square_by_idx(self, idx):
-        row, col = get_row_col_from_square_id(idx)
-        return self.create_board_group_from_square_by_pos(row, col)
-
-    def create_board_group_from_square_by_pos(self, row, col):
-        points_to_options = self.get_square_points_to_options(row, col)
-        return BoardGroup(points_to_options, name=f"square-{row}-{col}")
+        return self.create_board_group(SQUARE_UNIT + idx, SQUARES[idx])
 
     def get_square_points_to_options(self, row, col):
-        points_to_options = {}
-        for row, col in get_square_points(row, col):
-            points_to_options[(row, col)] = self.options[row][col]
-        return points_to_options
+        return {
+            CELL_POINT[cell]: self.candidates.options(cell)
+            for cell in SQUARES[CELL_SQUARE[row * 9 + col]]
+        }
 
     def update_board_options_according_to_value(self, row, col):
         val = self.board[row][col]
         if val == 0:
             return
-        for point in get_relevant_points(row, col):
-            if val in self.get_options(point):
-                self.get_options(point).discard(val)
-                session_update_list.append({"key": 'initial',
-                                            "point": point,
-                                            "new_options": list(self.get_options(point)),
-                                            "reason_points": [[row, col]],
-                                            "removed_option": val})
+        bit = VALUE_TO_BIT[val]
+        for cell in PEERS[row * 9 + col]:
+            if self.candidates.eliminate(cell, bit):
+                self.trace.record(
+                    INITIAL,
+                    cell,
+                    self.candidates[cell],
+                    bit,
+                    reason_points=row * 9 + col,
+                )
 
     def get_options(self, point):
-        return self.options[point[0]][point[1]]
+        return self.candidates.options(point[0] * 9 + point[1])
 
     def next_step(self):
-        res = set()
-        for i in range(9):
-            for j in range(9):
-                if len(self.options[i][j]) == 1:
-                    value = next(iter(self.options[i][j]))
-                    res.add(((i, j), value))
-                for value in self.options[i][j]:
-                    if self.only_value(i, j, value):
-                        res.add(((i, j), value))
-        return res
+        return TensorBoardSolver(self.board, self.candidates.masks).next_step()
+
+    def solve_exact(self):
+        return ExactCoverSolver(self.board, self.candidates.masks).solve()
+
+    def count_solutions(self, limit=2):
+        solver = ExactCoverSolver(self.board, self.candidates.masks)
+        return solver.count_solutions(limit)
+
+    def only_value_in_unit(self, cells, value):
+        bit = VALUE_TO_BIT[value]
+        masks = self.candidates.masks
+        return len([cell for cell in cells if masks[cell] & bit]) == 1
 
     def only_value_in_row(self, row, value):
-        return len([k for k in range(9) if value in self.options[row][k]]) == 1
+        return self.only_value_in_unit(ROWS[row], value)
 
     def only_value_in_col(self, col, value):
-        return len([k for k in range(9) if value in self.options[k][col]]) == 1
+        return self.only_value_in_unit(COLS[col], value)
 
     def only_value_in_square(self, row, col, value):
-        square_start_row = row - (row % 3)
-        square_start_col = col - (col % 3)
-        return (
-            len(
-                [
-                    (k, p)
-                    for p in range(3)
-                    for k in range(3)
-                    if value in self.options[square_start_row + p][square_start_col + k]
-                ]
-            )
-            == 1
-        )
+        return self.only_value_in_unit(SQUARES[CELL_SQUARE[row * 9 + col]], value)
 
     def only_value(self, row, col, value):
         return (
@@ -199,55 +235,89 @@ class BoardSolver:
             or self.only_value_in_square(row, col, value)
         )
 
-    def update_board_options_according_to_row_group(self, row):
-        point_to_options = self.create_points_from_row(row)
+    def update_board_options_according_to_group(self, group: BoardGroup):
+        group.handle_naked_subset()
+        self.check_rules()
 
-        self.handle_naked_subset(point_to_options)
-        self.assert_rules()
+        group.handle_hidden_subset()
+        self.check_rules()
 
-        self.handle_hidden_subset(point_to_options)
-        self.assert_rules()
+    def update_board_options_according_to_row_group(self, row):
+        self.update_board_options_according_to_group(self.rows[row])
 
     def update_board_options_according_to_col_group(self, col):
-        point_to_options = self.create_points_from_col(col)
-        self.handle_naked_subset(point_to_options)
-        self.assert_rules()
-
-        self.handle_hidden_subset(point_to_options)
-        self.assert_rules()
+        self.update_board_options_according_to_group(self.cols[col])
 
     def update_board_options_according_to_square_group(self, row, col):
-        point_to_options = self.create_points_from_square(row, col)
-        old_point_to_options = deepcopy(point_to_options)
-        self.handle_naked_subset(point_to_options)
-        old_point_to_options2 = deepcopy(point_to_options)
-
-        self.assert_rules()
-
-        self.handle_hidden_subset(point_to_options)
-        self.assert_rules()
+        square = self.squares[CELL_SQUARE[row * 9 + col]]
+        self.update_board_options_according_to_group(square)
 
     def print_options(self):
-        x = PrettyTable
+        x = PrettyTable()
         x.field_names = ["", 1, 2, 3, 4, 5, 6, 7, 8, 9]
-        for i, row in enumerate(self.options):
+        for i in range(9):
             x.add_row(
                 [
                     str(i + 1),
-                    *[",".join([str(option) for option in options]) for options in row],
+                    *[
+                        ",".join(str(option) for option in self.candidates.values(cell))
+                        for cell in ROWS[i]
+                    ],
                 ]
             )
         print(x)
 
     def solve_board(self):
-        self.eliminate_options_according_to_board()
-        self.orig_options = deepcopy(self.options)
-        reason_idx = 0
-        while reason_idx < len(session_update_list):
-            self.run_rules_on_point(session_update_list[reason_idx]["point"])
-            reason_idx += 1
-
-    def run_rules_on_point(self, point):
-        self.handle_naked_subset(point[0], point[1])
-        self.handle_hidden_subset(point[0], point[1])
-        self.handle_pointing_subset(point[0], point[1])
+        for _ in self.iter_solve():
+            pass
+
+    def iter_solve(self):
+        """Solve the board, yielding the trace index of every step once it is
+        recorded, so that callers can use the first steps before the solve
+        is done. Stopping between steps and calling it again goes on with
+        the solve."""
+        emitted = len(self.trace)
+        while self.next_given < 81:
+            i, j = divmod(self.next_given, 9)
+            self.next_given += 1
+            if self.board[i][j] > 0:
+                self.update_board_options_according_to_value(i, j)
+                self.check_rules()
+            if self.next_given == 81:
+                self.orig_options = self.candidates.copy()
+                self.propagator.mark_all()
+            yield from range(emitted, len(self.trace))
+            emitted = len(self.trace)
+        while self.propagator.queue:
+            self.propagator.step()
+            yield from range(emitted, len(self.trace))
+            emitted = len(self.trace)
+
+    @property
+    def done(self):
+        return self.next_given == 81 and not self.propagator.queue
+
+    def solve_within(self, budget: SolveBudget) -> Optional[SolveCursor]:
+        """Solve until done or until budget runs out.
+
+        Returns None when the board is done, else the cursor to resume the
+        solve from. Either way the trace holds the steps made so far.
+        """
+        steps = eliminations = 0
+        removed_options = self.trace.removed_options
+        for idx in self.iter_solve():
+            steps += 1
+            eliminations += POPCOUNT[removed_options[idx]]
+            if budget.exhausted(steps, eliminations) and not self.done:
+                return self.cursor()
+        return None
+
+    def cursor(self) -> SolveCursor:
+        return SolveCursor(
+            SOLVER_VERSION,
+            self.board,
+            tuple(self.candidates.masks),
+            self.next_given,
+            tuple(self.propagator.queue),
+            self.trace_offset + len(self.trace),
+        )
@@ -0,0 +1,113 @@
+import base64
+import struct
+import time
+from typing import NamedTuple, Optional, Tuple
+
+from django.core import signing
+
+from sudoku_teacher.board.packing import PACKED_SIZE, pack_board, unpack_board
+
+CURSOR_VERSION = 1
+# Binary form of a cursor: magic, format and solver versions, next given
+# cell, trace offset and queue length, then the packed board, the 81
+# candidate masks and the queued units, little endian.
+CURSOR_MAGIC = b"SCUR"
+CURSOR_HEADER = struct.Struct("<4sBBBIB")
+MASKS = struct.Struct("<81H")
+# Cursors handed to clients are signed, so that they come back unchanged.
+CURSOR_SALT = "sudoku_teacher.board.cursor"
+
+
+class SolveBudget(NamedTuple):
+    """Limits of a single solve call, None for no limit.
+
+    Steps and eliminations count from the start of the call, the deadline is
+    a ``time.monotonic()`` time. The budget is checked after every step, so
+    the steps of the rule being applied are kept and a call may go a few
+    steps over.
+    """
+
+    max_steps: Optional[int] = None
+    max_eliminations: Optional[int] = None
+    deadline: Optional[float] = None
+
+    @classmethod
+    def within(cls, seconds: float, **limits) -> "SolveBudget":
+        return cls(deadline=time.monotonic() + seconds, **limits)
+
+    def exhausted(self, steps: int, eliminations: int) -> bool:
+        return (
+            (self.max_steps is not None and steps >= self.max_steps)
+            or (
+                self.max_eliminations is not None
+                and eliminations >= self.max_eliminations
+            )
+            or (self.deadline is not None and time.monotonic() >= self.deadline)
+        )
+
+
+class SolveCursor(NamedTuple):
+    """Where a solve stopped: the candidates, the next given cell to apply,
+    81 once they all are, the queued units and how many steps the trace
+    holds so far."""
+
+    solver_version: int
+    board: list
+    masks: Tuple[int, ...]
+    next_given: int
+    queue: Tuple[int, ...]
+    offset: int
+
+    def to_bytes(self) -> bytes:
+        return b"".join(
+            (
+                CURSOR_HEADER.pack(
+                    CURSOR_MAGIC,
+                    CURSOR_VERSION,
+                    self.solver_version,
+                    self.next_given,
+                    self.offset,
+                    len(self.queue),
+                ),
+                pack_board(self.board),
+                MASKS.pack(*self.masks),
+                bytes(self.queue),
+            )
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SolveCursor":
+        if len(data) < CURSOR_HEADER.size + PACKED_SIZE + MASKS.size:
+            raise ValueError("truncated cursor data")
+        magic, version, solver_version, next_given, offset, queued = (
+            CURSOR_HEADER.unpack_from(data)
+        )
+        if magic != CURSOR_MAGIC or version != CURSOR_VERSION:
+            raise ValueError(f"not a version {CURSOR_VERSION} cursor")
+        start = CURSOR_HEADER.size
+        board = unpack_board(data[start : start + PACKED_SIZE])
+        start += PACKED_SIZE
+        masks = MASKS.unpack_from(data, start)
+        queue = tuple(data[start + MASKS.size :])
+        if (
+            next_given > 81
+            or any(mask > 0x1FF for mask in masks)
+            or len(queue) != queued
+            or len(set(queue)) != queued
+            or any(unit >= 27 for unit in queue)
+        ):
+            raise ValueError("invalid cursor data")
+        return cls(solver_version, board, masks, next_given, queue, offset)
+
+
+def dumps_cursor(cursor: SolveCursor) -> str:
+    data = base64.urlsafe_b64encode(cursor.to_bytes()).decode()
+    return signing.Signer(salt=CURSOR_SALT).sign(data)
+
+
+def loads_cursor(token: str) -> SolveCursor:
+    try:
+        data = signing.Signer(salt=CURSOR_SALT).unsign(token)
+    except signing.BadSignature:
+        raise ValueError("invalid cursor signature")
+    return SolveCursor.from_bytes(base64.urlsafe_b64decode(data))
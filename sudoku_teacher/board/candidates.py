@@ -0,0 +1,140 @@
+from collections.abc import MutableSet
+from typing import Callable, Iterable, List, Optional
+
+ALL_OPTIONS = 0x1FF
+
+# VALUE_TO_BIT[value] is the candidate bit of value (1..9), VALUE_TO_BIT[0] is 0.
+VALUE_TO_BIT = (0,) + tuple(1 << (value - 1) for value in range(1, 10))
+POPCOUNT = tuple(bin(mask).count("1") for mask in range(ALL_OPTIONS + 1))
+MASK_TO_VALUES = tuple(
+    tuple(value for value in range(1, 10) if mask & VALUE_TO_BIT[value])
+    for mask in range(ALL_OPTIONS + 1)
+)
+
+
+CHECK_OFF = "off"
+CHECK_INCREMENTAL = "incremental"
+CHECK_FULL = "full"
+CHECK_MODES = (CHECK_OFF, CHECK_INCREMENTAL, CHECK_FULL)
+
+
+class Contradiction(Exception):
+    """Raised when a cell that is not given is left without candidates."""
+
+    def __init__(self, cell: int):
+        super().__init__(cell)
+        self.cell = cell
+
+
+def popcount(mask: int) -> int:
+    return POPCOUNT[mask]
+
+
+def lowest_bit(mask: int) -> int:
+    return mask & -mask
+
+
+def bit_to_value(bit: int) -> int:
+    return bit.bit_length()
+
+
+def values_to_mask(values: Iterable[int]) -> int:
+    mask = 0
+    for value in values:
+        mask |= VALUE_TO_BIT[value]
+    return mask
+
+
+def mask_to_values(mask: int):
+    return MASK_TO_VALUES[mask]
+
+
+class CandidateStore:
+    """Candidates of the 81 cells, one 9-bit mask per cell in a flat array.
+
+    Bit ``value - 1`` of ``masks[row * 9 + col]`` is set while ``value`` is
+    still possible in that cell. Solved and given cells hold 0. Candidates
+    are removed through ``eliminate``, which tells ``listener`` which cell
+    lost candidates and, when ``check`` is set, raises ``Contradiction`` if the
+    cell is left empty. Direct assignments notify ``listener`` as well.
+    """
+
+    __slots__ = ("masks", "listener", "check")
+
+    def __init__(self, masks: Optional[Iterable[int]] = None):
+        self.masks: List[int] = (
+            list(masks) if masks is not None else [ALL_OPTIONS] * 81
+        )
+        self.listener: Optional[Callable[[int], None]] = None
+        self.check = False
+
+    @classmethod
+    def from_board(cls, board) -> "CandidateStore":
+        return cls(
+            0 if board[row][col] else ALL_OPTIONS
+            for row in range(9)
+            for col in range(9)
+        )
+
+    def __getitem__(self, cell: int) -> int:
+        return self.masks[cell]
+
+    def __setitem__(self, cell: int, mask: int):
+        if self.masks[cell] != mask:
+            self.masks[cell] = mask
+            if self.listener is not None:
+                self.listener(cell)
+
+    def __len__(self):
+        return len(self.masks)
+
+    def eliminate(self, cell: int, mask: int) -> int:
+        """Remove the candidates in mask from cell and return the removed bits."""
+        removed = self.masks[cell] & mask
+        if removed:
+            self.masks[cell] ^= removed
+            if self.check and not self.masks[cell]:
+                raise Contradiction(cell)
+            if self.listener is not None:
+                self.listener(cell)
+        return removed
+
+    def copy(self) -> "CandidateStore":
+        return CandidateStore(self.masks)
+
+    def values(self, cell: int):
+        return MASK_TO_VALUES[self.masks[cell]]
+
+    def options(self, cell: int) -> "CellOptions":
+        return CellOptions(self, cell)
+
+
+class CellOptions(MutableSet):
+    __slots__ = ("store", "cell")
+
+    def __init__(self, store: CandidateStore, cell: int):
+        self.store = store
+        self.cell = cell
+
+    def __contains__(self, value):
+        if not isinstance(value, int) or not 1 <= value <= 9:
+            return False
+        return bool(self.store.masks[self.cell] & VALUE_TO_BIT[value])
+
+    def __iter__(self):
+        return iter(MASK_TO_VALUES[self.store.masks[self.cell]])
+
+    def __len__(self):
+        return POPCOUNT[self.store.masks[self.cell]]
+
+    def add(self, value):
+        self.store[self.cell] = self.store.masks[self.cell] | VALUE_TO_BIT[value]
+
+    def discard(self, value):
+        self.store[self.cell] = self.store.masks[self.cell] & ~VALUE_TO_BIT[value]
+
+    def update(self, values):
+        self.store[self.cell] = self.store.masks[self.cell] | values_to_mask(values)
+
+    def __repr__(self):
+        return f"CellOptions({set(self)})"
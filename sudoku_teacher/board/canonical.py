@@ -0,0 +1,209 @@
+import itertools
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+from sudoku_teacher.board.board_index import (
+    CELLS,
+    CELL_COL,
+    CELL_ROW,
+    CELL_SQUARE,
+    COL_UNIT,
+    ROW_UNIT,
+    SQUARE_UNIT,
+    UNITS,
+)
+from sudoku_teacher.board.candidates import MASK_TO_VALUES, VALUE_TO_BIT
+from sudoku_teacher.board.solve_cache import puzzle_fingerprint
+from sudoku_teacher.board.trace import INITIAL, NO_UNIT, SolveTrace
+
+# Boards related by relabeling the digits, permuting the bands, the stacks,
+# the rows inside a band and the cols inside a stack, and transposing, have
+# the same solve up to that transformation. The canonical representative of
+# a board is the lexicographically smallest over all of them of its givens
+# pattern (0 for empty, 1 for given, row by row) and then of its digits,
+# relabeled in order of first appearance.
+
+PERMS3 = tuple(itertools.permutations(range(3)))
+# LINE_ARRANGEMENTS[i][k] is the line moved to position k by arrangement i,
+# for every order of the three bands and of the three lines inside each band.
+LINE_ARRANGEMENTS = np.array(
+    [
+        [3 * bands[band] + lines[band][k] for band in range(3) for k in range(3)]
+        for bands in PERMS3
+        for lines in itertools.product(PERMS3, repeat=3)
+    ],
+    dtype=np.intp,
+)
+# Row mask of a givens pattern, col 0 is the highest bit so that comparing
+# masks compares the pattern lexicographically.
+COL_WEIGHTS = 1 << np.arange(8, -1, -1)
+# Bounds of the arrangements compared digit by digit when patterns tie, they
+# only matter for very symmetric patterns, e.g. nearly full boards. Beyond
+# them the representative is still exact but equivalent boards may get
+# different ones.
+MAX_PATTERN_TIES = 200
+MAX_CANDIDATES = 4096
+
+
+@lru_cache(maxsize=None)
+def _mask_arrangements():
+    # _mask_arrangements()[i][mask] is the row mask after moving the cols of
+    # mask by LINE_ARRANGEMENTS[i]
+    bits = (np.arange(512)[:, None] & COL_WEIGHTS) > 0
+    moved = bits[:, LINE_ARRANGEMENTS].transpose(1, 0, 2)
+    return (moved * COL_WEIGHTS).sum(axis=-1).astype(np.int64)
+
+
+class Transform(NamedTuple):
+    """A board symmetry: optionally transpose, then move row rows[i] to row
+    i and col cols[j] to col j, then relabel value v as digits[v]."""
+
+    transpose: bool
+    rows: Tuple[int, ...]
+    cols: Tuple[int, ...]
+    digits: Tuple[int, ...]
+
+    @classmethod
+    def identity(cls) -> "Transform":
+        return cls(False, tuple(range(9)), tuple(range(9)), tuple(range(10)))
+
+    def apply(self, board):
+        source = [list(col) for col in zip(*board)] if self.transpose else board
+        return [
+            [self.digits[source[row][col]] for col in self.cols] for row in self.rows
+        ]
+
+    def inverse(self) -> "Transform":
+        rows = tuple(self.rows.index(row) for row in range(9))
+        cols = tuple(self.cols.index(col) for col in range(9))
+        digits = tuple(self.digits.index(value) for value in range(10))
+        if self.transpose:
+            return Transform(True, cols, rows, digits)
+        return Transform(False, rows, cols, digits)
+
+    def cell(self, cell: int) -> int:
+        return _tables(self)[0][cell]
+
+    def unit(self, unit: int) -> int:
+        return _tables(self)[1][unit]
+
+    def mask(self, mask: int) -> int:
+        new_mask = 0
+        for value in MASK_TO_VALUES[mask]:
+            new_mask |= VALUE_TO_BIT[self.digits[value]]
+        return new_mask
+
+    def map_trace(self, trace: SolveTrace) -> SolveTrace:
+        """The trace of the transformed board, made of the same steps."""
+        cell_map, unit_map, position_map = _tables(self)
+        mapped = SolveTrace(max_steps=len(trace))
+        for idx in range(len(trace)):
+            kind = trace.kinds[idx]
+            unit = trace.units[idx]
+            neighbor = trace.neighbors[idx]
+            points = trace.reason_points[idx]
+            if kind == INITIAL:
+                points = cell_map[points]
+            elif unit != NO_UNIT:
+                positions = position_map[unit]
+                points = sum(
+                    1 << positions[pos] for pos in range(9) if points >> pos & 1
+                )
+            mapped.record(
+                kind,
+                cell_map[trace.cells[idx]],
+                self.mask(trace.new_options[idx]),
+                self.mask(trace.removed_options[idx]),
+                unit_map[unit] if unit != NO_UNIT else NO_UNIT,
+                unit_map[neighbor] if neighbor != NO_UNIT else NO_UNIT,
+                points,
+                self.mask(trace.reason_options[idx]),
+            )
+        mapped.truncated = trace.truncated
+        return mapped
+
+
+@lru_cache(maxsize=256)
+def _tables(transform: Transform):
+    rows = [transform.rows.index(row) for row in range(9)]
+    cols = [transform.cols.index(col) for col in range(9)]
+    cell_map = []
+    for cell in CELLS:
+        row, col = CELL_ROW[cell], CELL_COL[cell]
+        if transform.transpose:
+            row, col = col, row
+        cell_map.append(rows[row] * 9 + cols[col])
+
+    unit_map, position_map = [], []
+    for cells in UNITS:
+        mapped = [cell_map[cell] for cell in cells]
+        if len({CELL_ROW[cell] for cell in mapped}) == 1:
+            unit = ROW_UNIT + CELL_ROW[mapped[0]]
+        elif len({CELL_COL[cell] for cell in mapped}) == 1:
+            unit = COL_UNIT + CELL_COL[mapped[0]]
+        else:
+            unit = SQUARE_UNIT + CELL_SQUARE[mapped[0]]
+        unit_map.append(unit)
+        position_map.append(tuple(UNITS[unit].index(cell) for cell in mapped))
+    return tuple(cell_map), tuple(unit_map), tuple(position_map)
+
+
+def canonicalize(board):
+    """Return the canonical representative of board and the transformation
+    that maps board onto it."""
+    grids = np.array(board, dtype=np.int8)
+    grids = np.stack((grids, grids.T))
+    masks = (grids > 0).astype(np.int64) @ COL_WEIGHTS
+
+    # For every transposition and col arrangement the smallest pattern comes
+    # from sorting the rows inside the bands and then the bands.
+    moved = _mask_arrangements()[:, masks].transpose(1, 0, 2)
+    in_band = np.sort(moved.reshape(2, -1, 3, 3), axis=-1)
+    band_keys = np.sort((in_band * np.array([1 << 18, 1 << 9, 1])).sum(-1), -1)
+    tied = np.ones(band_keys.shape[:2], dtype=bool)
+    for band in range(3):
+        keys = np.where(tied, band_keys[..., band], np.iinfo(np.int64).max)
+        tied &= keys == keys.min()
+    transposes, col_arrangements = np.nonzero(tied)
+    transposes = transposes[:MAX_PATTERN_TIES]
+    col_arrangements = col_arrangements[:MAX_PATTERN_TIES]
+
+    # Every row arrangement that gives that pattern is a candidate.
+    row_masks = moved[transposes, col_arrangements][:, LINE_ARRANGEMENTS]
+    pattern = row_masks[0, np.lexsort(row_masks[0].T[::-1])[0]]
+    candidates, row_arrangements = np.nonzero((row_masks == pattern).all(axis=-1))
+    candidates = candidates[:MAX_CANDIDATES]
+    row_arrangements = row_arrangements[:MAX_CANDIDATES]
+    transposes = transposes[candidates]
+    col_arrangements = col_arrangements[candidates]
+    rows = LINE_ARRANGEMENTS[row_arrangements]
+    cols = LINE_ARRANGEMENTS[col_arrangements]
+    flat = grids[
+        transposes[:, None, None], rows[:, :, None], cols[:, None, :]
+    ].reshape(-1, 81)
+
+    # Relabel the digits of every candidate in order of first appearance,
+    # absent digits last, and keep the smallest.
+    present = flat[:, :, None] == np.arange(1, 10)
+    first_seen = np.where(present.any(axis=1), present.argmax(axis=1), 81)
+    order = np.argsort(first_seen, axis=1, kind="stable")
+    digits = np.zeros((len(flat), 10), dtype=np.int8)
+    np.put_along_axis(digits[:, 1:], order, np.arange(1, 10, dtype=np.int8), 1)
+    relabeled = np.take_along_axis(digits, flat.astype(np.intp), axis=1)
+    best = np.lexsort(relabeled.T[::-1])[0]
+
+    transform = Transform(
+        bool(transposes[best]),
+        tuple(rows[best].tolist()),
+        tuple(cols[best].tolist()),
+        tuple(digits[best].tolist()),
+    )
+    canonical = relabeled[best].reshape(9, 9).tolist()
+    return canonical, transform
+
+
+def canonical_fingerprint(board) -> str:
+    canonical, _ = canonicalize(board)
+    return puzzle_fingerprint(canonical)
@@ -0,0 +1,141 @@
+import itertools
+import time
+from concurrent.futures import Executor
+from typing import BinaryIO, Callable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from sudoku_teacher.board.board_index import UNITS
+from sudoku_teacher.board.canonical import canonical_fingerprint
+from sudoku_teacher.board.models import Puzzle
+from sudoku_teacher.board.puzzles import PuzzleWriter
+from sudoku_teacher.board.workers import map_chunks
+
+# Datasets hold a puzzle per line: 81 characters, row by row, with "." or
+# "0" for blanks, optionally followed by other fields after a separator.
+# Blank lines and lines starting with "#" are skipped.
+BOARD_CHARS = 81
+# Value of every byte in a board, INVALID for bytes that are not one.
+BYTE_VALUES = np.full(256, 255, dtype=np.uint8)
+BYTE_VALUES[ord(".")] = 0
+BYTE_VALUES[ord("0") : ord("9") + 1] = np.arange(10)
+INVALID = 255
+UNIT_CELLS = np.array(UNITS, dtype=np.intp)
+
+
+class ParsedChunk(NamedTuple):
+    grids: np.ndarray
+    lines: int
+    invalid: int
+
+
+class DatasetProgress(NamedTuple):
+    lines: int
+    invalid: int
+    imported: int
+    duplicates: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.lines / self.seconds if self.seconds else 0.0
+
+
+def board_line(line: bytes) -> Optional[bytes]:
+    """The board characters of a dataset line, None when it holds no puzzle
+    and b"" when it is not a valid one."""
+    line = line.strip()
+    if not line or line.startswith(b"#"):
+        return None
+    board = line[:BOARD_CHARS]
+    if len(board) < BOARD_CHARS or line[BOARD_CHARS : BOARD_CHARS + 1].isalnum():
+        return b""
+    return board
+
+
+def parse_chunk(lines: List[bytes]) -> ParsedChunk:
+    """Parse and validate lines at once, giving the (n, 81) grids of the
+    valid puzzles: only digits and dots, and no value given twice in a
+    unit."""
+    boards = [board_line(line) for line in lines]
+    boards = [board for board in boards if board is not None]
+    malformed = sum(1 for board in boards if not board)
+    data = b"".join(board for board in boards if board)
+    grids = BYTE_VALUES[np.frombuffer(data, dtype=np.uint8)].reshape(-1, 81)
+    valid = (grids != INVALID).all(axis=1)
+    values = np.where(valid[:, None], grids, 0)[:, UNIT_CELLS]
+    counts = (values[..., None] == np.arange(1, 10)).sum(axis=2)
+    valid &= (counts <= 1).all(axis=(1, 2))
+    return ParsedChunk(grids[valid], len(boards), malformed + int((~valid).sum()))
+
+
+def pack_grids(grids: np.ndarray) -> List[bytes]:
+    """``packing.pack_board`` of every grid at once."""
+    cells = np.zeros((len(grids), 82), dtype=np.uint8)
+    cells[:, :81] = grids
+    packed = cells[:, 0::2] << 4 | cells[:, 1::2]
+    return [row.tobytes() for row in packed]
+
+
+def fingerprint_grids(data: bytes) -> List[str]:
+    grids = np.frombuffer(data, dtype=np.uint8).reshape(-1, 9, 9)
+    return [canonical_fingerprint(grid.tolist()) for grid in grids]
+
+
+def iter_chunks(f: BinaryIO, chunk_size: int) -> Iterator[List[bytes]]:
+    while True:
+        lines = list(itertools.islice(f, chunk_size))
+        if not lines:
+            return
+        yield lines
+
+
+def import_dataset(
+    f: BinaryIO,
+    level: str,
+    chunk_size=10000,
+    batch_size=1000,
+    executor: Optional[Executor] = None,
+    max_pending=2,
+    progress: Optional[Callable[[DatasetProgress], None]] = None,
+) -> DatasetProgress:
+    """Stream the puzzles of a dataset file into level.
+
+    Chunks of lines are parsed and validated with numpy, their boards are
+    fingerprinted by ``map_chunks`` and new ones written by a
+    ``PuzzleWriter``.
+    ``progress`` gets the running totals after every chunk.
+    """
+    started = time.monotonic()
+    writer = PuzzleWriter(level, batch_size)
+    lines = invalid = imported = duplicates = 0
+
+    def store(chunk: ParsedChunk, fingerprints):
+        nonlocal lines, invalid, imported, duplicates
+        givens = (chunk.grids > 0).sum(axis=1).tolist()
+        result = writer.write(
+            Puzzle(packed=packed, canonical_hash=fingerprint, givens=count)
+            for packed, fingerprint, count in zip(
+                pack_grids(chunk.grids), fingerprints, givens
+            )
+        )
+        lines += chunk.lines
+        invalid += chunk.invalid
+        imported += result.imported
+        duplicates += result.duplicates
+        if progress is not None:
+            progress(current())
+
+    def current():
+        seconds = time.monotonic() - started
+        return DatasetProgress(lines, invalid, imported, duplicates, seconds)
+
+    chunks = (parse_chunk(chunk_lines) for chunk_lines in iter_chunks(f, chunk_size))
+    map_chunks(
+        fingerprint_grids,
+        ((chunk, chunk.grids.tobytes()) for chunk in chunks),
+        store,
+        executor,
+        max_pending,
+    )
+    return current()
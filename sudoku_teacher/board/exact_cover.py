@@ -0,0 +1,145 @@
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from sudoku_teacher.board.board_index import CELLS, CELL_COL, CELL_ROW, CELL_SQUARE
+from sudoku_teacher.board.candidates import ALL_OPTIONS, MASK_TO_VALUES
+
+# The 324 constraints of a sudoku: every cell holds a value, and every row,
+# col and square holds every value once. A choice (cell, value) covers one
+# constraint of each kind.
+CELL_CONSTRAINT = 0
+ROW_CONSTRAINT = 81
+COL_CONSTRAINT = 162
+SQUARE_CONSTRAINT = 243
+
+Choice = Tuple[int, int]
+
+
+def choice_constraints(cell: int, value: int) -> Tuple[int, int, int, int]:
+    digit = value - 1
+    return (
+        CELL_CONSTRAINT + cell,
+        ROW_CONSTRAINT + CELL_ROW[cell] * 9 + digit,
+        COL_CONSTRAINT + CELL_COL[cell] * 9 + digit,
+        SQUARE_CONSTRAINT + CELL_SQUARE[cell] * 9 + digit,
+    )
+
+
+# CHOICE_CONSTRAINTS[cell][value] for value 1..9.
+CHOICE_CONSTRAINTS = tuple(
+    (None,) + tuple(choice_constraints(cell, value) for value in range(1, 10))
+    for cell in CELLS
+)
+
+
+class ExactCoverSolver:
+    """Knuth's Algorithm X over the sudoku exact cover matrix.
+
+    The matrix is kept as a mapping from each constraint to the set of
+    choices that cover it, so covering and uncovering a column are set
+    operations, which is the dancing links idea without the linked lists.
+    Columns are chosen by fewest remaining choices.
+
+    The matrix is built from the givens of ``board`` and, for the other
+    cells, from the candidate masks of ``masks`` (by default every value),
+    so a solver can continue from a partially eliminated ``BoardSolver``.
+    """
+
+    def __init__(self, board, masks: Optional[List[int]] = None):
+        if masks is None:
+            masks = [ALL_OPTIONS] * 81
+        self.givens: List[Choice] = []
+        self.columns: Dict[int, Set[Choice]] = {
+            constraint: set() for constraint in range(324)
+        }
+        for cell in CELLS:
+            value = board[CELL_ROW[cell]][CELL_COL[cell]]
+            if value:
+                self.givens.append((cell, value))
+                values = (value,)
+            else:
+                values = MASK_TO_VALUES[masks[cell]]
+            for value in values:
+                for constraint in CHOICE_CONSTRAINTS[cell][value]:
+                    self.columns[constraint].add((cell, value))
+
+    def select(self, choice: Choice) -> List[Set[Choice]]:
+        cell, value = choice
+        removed = []
+        for constraint in CHOICE_CONSTRAINTS[cell][value]:
+            for other in self.columns[constraint]:
+                for other_constraint in CHOICE_CONSTRAINTS[other[0]][other[1]]:
+                    if other_constraint != constraint:
+                        self.columns[other_constraint].discard(other)
+            removed.append(self.columns.pop(constraint))
+        return removed
+
+    def deselect(self, choice: Choice, removed: List[Set[Choice]]):
+        cell, value = choice
+        constraints = CHOICE_CONSTRAINTS[cell][value]
+        for constraint in reversed(constraints):
+            self.columns[constraint] = removed.pop()
+            for other in self.columns[constraint]:
+                for other_constraint in CHOICE_CONSTRAINTS[other[0]][other[1]]:
+                    if other_constraint != constraint:
+                        self.columns[other_constraint].add(other)
+
+    def search(self, chosen: List[Choice]) -> Iterator[List[Choice]]:
+        if not self.columns:
+            yield chosen
+            return
+        constraint = min(self.columns, key=lambda c: len(self.columns[c]))
+        for choice in sorted(self.columns[constraint]):
+            removed = self.select(choice)
+            chosen.append(choice)
+            try:
+                yield from self.search(chosen)
+            finally:
+                chosen.pop()
+                self.deselect(choice, removed)
+
+    def solutions(self, limit: Optional[int] = None) -> Iterator[List[List[int]]]:
+        """Yield solved boards, at most limit of them."""
+        if limit is not None and limit <= 0:
+            return
+        selected = []
+        try:
+            for choice in self.givens:
+                cell, value = choice
+                constraints = CHOICE_CONSTRAINTS[cell][value]
+                if any(c not in self.columns for c in constraints):
+                    # two givens share a constraint
+                    return
+                selected.append((choice, self.select(choice)))
+            found = 0
+            for chosen in self.search([]):
+                yield self.to_board(chosen)
+                found += 1
+                if found == limit:
+                    return
+        finally:
+            for choice, removed in reversed(selected):
+                self.deselect(choice, removed)
+
+    def to_board(self, chosen: List[Choice]) -> List[List[int]]:
+        board = [[0] * 9 for _ in range(9)]
+        for cell, value in self.givens + chosen:
+            board[CELL_ROW[cell]][CELL_COL[cell]] = value
+        return board
+
+    def solve(self) -> Optional[List[List[int]]]:
+        return next(self.solutions(limit=1), None)
+
+    def count_solutions(self, limit: int = 2) -> int:
+        return sum(1 for _ in self.solutions(limit=limit))
+
+
+def solve(board, masks: Optional[List[int]] = None) -> Optional[List[List[int]]]:
+    return ExactCoverSolver(board, masks).solve()
+
+
+def count_solutions(board, limit: int = 2, masks: Optional[List[int]] = None) -> int:
+    return ExactCoverSolver(board, masks).count_solutions(limit)
+
+
+def has_unique_solution(board) -> bool:
+    return count_solutions(board, limit=2) == 1
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class SolverBusy(Exception):
+    """Raised when too many solves are already running or waiting."""
+
+
+class BoundedExecutor:
+    """A thread pool for solves with a cap on the solves it holds.
+
+    Async views await their solves here, so the event loop keeps serving
+    other requests while boards are solved, and at most ``max_pending``
+    solves are running or queued at once; more raise ``SolverBusy``. A
+    caller that stops waiting sets the ``cancel_event`` of its solve.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="board-solver"
+        )
+
+    def _reserve(self):
+        with self.lock:
+            if self.pending >= self.max_pending:
+                raise SolverBusy()
+            self.pending += 1
+
+    def _release(self, future=None):
+        with self.lock:
+            self.pending -= 1
+
+    def _submit(self, cancel, func, *args):
+        # the slot is given back once the thread is done with func, not when
+        # the caller stops waiting for it
+        future = self.executor.submit(_call, cancel, func, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, func, *args):
+        self._reserve()
+        cancel = threading.Event()
+        try:
+            return await asyncio.wrap_future(self._submit(cancel, func, *args))
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+    async def iterate(self, func, *args):
+        """Yield the items of the iterator ``func(*args)`` as a worker thread
+        makes them. Closing it early stops the thread at its next item."""
+        self._reserve()
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for item in func(*args):
+                    loop.call_soon_threadsafe(items.put_nowait, ("item", item))
+                    if stop.is_set():
+                        return
+            except Exception as e:
+                loop.call_soon_threadsafe(items.put_nowait, ("error", e))
+            else:
+                loop.call_soon_threadsafe(items.put_nowait, ("done", None))
+
+        self._submit(stop, produce)
+        try:
+            while True:
+                kind, item = await items.get()
+                if kind == "done":
+                    return
+                if kind == "error":
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+_local = threading.local()
+
+
+def cancel_event() -> Optional[threading.Event]:
+    """The event set once nobody waits for the solve running in this thread,
+    None outside the solver executor."""
+    return getattr(_local, "cancel", None)
+
+
+def _call(cancel, func, *args):
+    if cancel.is_set():
+        return None
+    # the worker threads outlive requests, keep their connections healthy
+    close_old_connections()
+    _local.cancel = cancel
+    try:
+        return func(*args)
+    finally:
+        _local.cancel = None
+        close_old_connections()
+
+
+_executor: Optional[BoundedExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_solver_executor() -> BoundedExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = BoundedExecutor(
+                getattr(settings, "BOARD_SOLVER_WORKERS", 2),
+                getattr(settings, "BOARD_SOLVER_MAX_PENDING", 32),
+            )
+        return _executor
+
+
+async def run_solver(func, *args):
+    return await get_solver_executor().run(func, *args)
+
+
+def iterate_solver(func, *args):
+    return get_solver_executor().iterate(func, *args)
@@ -0,0 +1,92 @@
+import time
+from concurrent.futures import Executor
+from typing import Callable, List, NamedTuple, Optional
+
+from django.db import transaction
+
+from sudoku_teacher.board.board_solver import SOLVER_VERSION
+from sudoku_teacher.board.jobs import grade_packed_boards
+from sudoku_teacher.board.models import Puzzle
+from sudoku_teacher.board.workers import map_chunks
+
+
+class GradeProgress(NamedTuple):
+    graded: int
+    unsolved: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.graded / self.seconds if self.seconds else 0.0
+
+
+def ungraded_puzzles(level: Optional[str] = None, force=False):
+    """Puzzles without a grade of the current solver version, all of them
+    when force is set."""
+    puzzles = Puzzle.objects.all()
+    if level is not None:
+        puzzles = puzzles.filter(level=level)
+    if not force:
+        puzzles = puzzles.exclude(graded_version=SOLVER_VERSION)
+    return puzzles
+
+
+def store_grades(pks: List[int], grades) -> int:
+    puzzles = [
+        Puzzle(
+            pk=pk,
+            grade=grade.level,
+            technique_counts=list(grade.counts),
+            graded_version=SOLVER_VERSION,
+        )
+        for pk, grade in zip(pks, grades)
+    ]
+    with transaction.atomic():
+        Puzzle.objects.bulk_update(
+            puzzles, ["grade", "technique_counts", "graded_version"]
+        )
+    return sum(1 for grade in grades if not grade.solved)
+
+
+def grade_puzzles(
+    level: Optional[str] = None,
+    force=False,
+    chunk_size=500,
+    executor: Optional[Executor] = None,
+    max_pending=2,
+    progress: Optional[Callable[[GradeProgress], None]] = None,
+) -> GradeProgress:
+    """Grade the puzzles with the logical solver and write the grades back.
+
+    Puzzles are read in chunks by increasing id and graded by
+    ``map_chunks``. Every chunk is written as soon as it is graded, so an
+    interrupted run loses at most the chunks in flight, and running it again
+    grades only the puzzles left, as well as every puzzle graded by an older
+    solver version.
+    """
+    started = time.monotonic()
+    puzzles = ungraded_puzzles(level, force).order_by("pk")
+    graded = unsolved = 0
+
+    def store(pks, grades):
+        nonlocal graded, unsolved
+        unsolved += store_grades(pks, grades)
+        graded += len(pks)
+        if progress is not None:
+            progress(current())
+
+    def current():
+        return GradeProgress(graded, unsolved, time.monotonic() - started)
+
+    def chunks():
+        last_pk = 0
+        while True:
+            rows = puzzles.filter(pk__gt=last_pk).values_list("pk", "packed")
+            rows = list(rows[:chunk_size])
+            if not rows:
+                return
+            last_pk = rows[-1][0]
+            yield [pk for pk, _ in rows], [bytes(data) for _, data in rows]
+
+    map_chunks(grade_packed_boards, chunks(), store, executor, max_pending)
+    return current()
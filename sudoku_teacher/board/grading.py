@@ -0,0 +1,60 @@
+from typing import NamedTuple, Tuple
+
+from sudoku_teacher.board.candidates import POPCOUNT
+from sudoku_teacher.board.trace import (
+    CLAIMING,
+    INITIAL,
+    NAKED,
+    POINTING,
+    SolveTrace,
+)
+
+# Techniques from easiest to hardest. Subsets are told apart by their size,
+# the popcount of the reason points of their steps.
+TECHNIQUES = (
+    "initial",
+    "naked single",
+    "hidden single",
+    "intersection",
+    "naked pair",
+    "hidden pair",
+    "naked triple",
+    "hidden triple",
+    "naked quad",
+    "hidden quad",
+)
+# The level of boards the techniques do not finish.
+UNSOLVED = len(TECHNIQUES)
+SUBSET_NAMES = {1: "single", 2: "pair", 3: "triple", 4: "quad"}
+
+
+def step_technique(trace: SolveTrace, idx: int) -> int:
+    kind = trace.kinds[idx]
+    if kind == INITIAL:
+        return 0
+    if kind in (POINTING, CLAIMING):
+        return TECHNIQUES.index("intersection")
+    size = POPCOUNT[trace.reason_points[idx]]
+    name = "naked" if kind == NAKED else "hidden"
+    return TECHNIQUES.index(f"{name} {SUBSET_NAMES[size]}")
+
+
+class Grade(NamedTuple):
+    level: int
+    counts: Tuple[int, ...]
+    solved: bool
+
+    @property
+    def technique(self) -> str:
+        return TECHNIQUES[self.level] if self.level < UNSOLVED else "unsolved"
+
+
+def grade_trace(trace: SolveTrace, solved: bool) -> Grade:
+    """Grade a solve by its hardest technique; boards the techniques do not
+    finish get the UNSOLVED level."""
+    counts = [0] * len(TECHNIQUES)
+    for idx in range(len(trace)):
+        counts[step_technique(trace, idx)] += 1
+    used = [level for level, count in enumerate(counts) if count]
+    level = max(used, default=0) if solved else UNSOLVED
+    return Grade(level, tuple(counts), solved)
@@ -1,136 +1,84 @@
-from copy import deepcopy
-from typing import List, Type, TypeVar
+from typing import List, NamedTuple, Tuple
 
-from django.contrib.sessions.backends.db import SessionStore
+from sudoku_teacher.board.candidates import POPCOUNT
+from sudoku_teacher.board.trace import HIDDEN, NAKED, NO_UNIT, SolveTrace
 
-SESSION_KEY = "updates"
+# A naked subset of k cells among n open cells makes the same eliminations as
+# the hidden subset of the other n - k cells, so with both rules sizes up to 4
+# cover every subset of a unit.
+MAX_SUBSET_SIZE = 4
 
-T = TypeVar("T", bound="SubsetSubsetTreeNode")
 
-session = SessionStore()
-session_update_list = session.setdefault(SESSION_KEY, list())
+class Subset(NamedTuple):
+    # points is a position mask, bit i stands for the i-th cell of the group,
+    # and options is a candidate mask.
+    points: int
+    options: int
 
 
-class SubsetSubsetTreeNode:
-    def __init__(self, id_subset, data_subset):
-        self.id_subset = id_subset
-        self.data_subset = data_subset
-        self.children: List[Type[T]] = []
+def find_subsets(items: List[Tuple[int, int]], max_size: int):
+    """Find every subset of items whose masks cover exactly as many bits.
 
-    def add_child(self, node: Type[T]):
-        if not self.id_subset.issubset(node.id_subset):
-            return False
-        found_child = any([child.add_child(node) for child in self.children])
-        if not found_child:
-            node.data_subset.update(self.data_subset)
-            self.children.append(node)
-        return True
+    items are (key bit, mask) pairs. Unions of up to max_size items are
+    enumerated in increasing order, and a branch is pruned as soon as its
+    union has more than max_size bits. Returns (keys, union) pairs sorted by
+    size.
+    """
+    found = []
 
-    def __str__(self):
-        return f"SubsetSubsetTreeNode(id = {self.id_subset}, data = {self.data_subset})"
-
-    def __repr__(self):
-        return str(self)
-
-
-class OptionsPointsTreeNode(SubsetSubsetTreeNode):
-    def __init__(self, options, points):
-        super().__init__(options, points)
-
-    @property
-    def options(self):
-        return self.id_subset
-
-    @property
-    def points(self):
-        return self.data_subset
-
-
-def update_naked(node: OptionsPointsTreeNode, point_to_options, name: str):
-    if len(node.options) == len(node.points):
-        for point, options in point_to_options.items():
-            if point in node.points or not options:
+    def extend(start, keys, union, size):
+        for i in range(start, len(items)):
+            key, mask = items[i]
+            new_union = union | mask
+            if POPCOUNT[new_union] > max_size:
                 continue
-            orig_options = deepcopy(options)
-            options.difference_update(node.options)
-            if options != orig_options:
-                update_move(point, node, options, orig_options, name, "naked")
-
-        return
-    for child in node.children:
-        update_naked(child, point_to_options, name)
-
-
-def update_move(point, node, new_options, orig_options, name, reason, neighbor=""):
-    if new_options == orig_options:
+            if POPCOUNT[new_union] == size + 1:
+                found.append((keys | key, new_union))
+            if size + 1 < max_size:
+                extend(i + 1, keys | key, new_union, size + 1)
+
+    extend(0, 0, 0, 0)
+    found.sort(key=lambda subset: (POPCOUNT[subset[1]], subset[0]))
+    return found
+
+
+def update_naked(trace: SolveTrace, subset: Subset, candidates, cells, unit):
+    masks = candidates.masks
+    for pos, cell in enumerate(cells):
+        if subset.points >> pos & 1 or not masks[cell] & subset.options:
+            continue
+        removed = candidates.eliminate(cell, subset.options)
+        update_move(trace, cell, subset, masks[cell], removed, unit, NAKED)
+
+
+def update_move(
+    trace: SolveTrace,
+    cell,
+    node,
+    new_options,
+    removed_options,
+    unit,
+    kind,
+    neighbor=NO_UNIT,
+):
+    if not removed_options:
         return
-    session_update_list.append(
-        {
-            "key": reason,
-            "point": point,
-            "orig_options": sorted(orig_options),
-            "new_options": sorted(new_options),
-            "reason_points": sorted(node.points) if node else [],
-            "reason_options": sorted(node.options) if node else [],
-            "rule_loc": name,
-            "neighbor": neighbor,
-        }
+    trace.record(
+        kind,
+        cell,
+        new_options,
+        removed_options,
+        unit,
+        neighbor,
+        node.points if node else 0,
+        node.options if node else 0,
     )
 
 
-class PointsOptionsTreeNode(SubsetSubsetTreeNode):
-    def __init__(self, points, options):
-        super().__init__(points, options)
-
-    @property
-    def points(self):
-        return self.id_subset
-
-    @property
-    def options(self):
-        return self.data_subset
-
-
-def update_hidden(node: PointsOptionsTreeNode, point_to_options, name):
-    if len(node.points) == len(node.options):
-        for point in node.id_subset:
-            orig_options = deepcopy(point_to_options[point])
-            new_options = orig_options.intersection(node.options)
-            point_to_options[point].clear()
-            point_to_options[point].update(new_options)
-            update_move(point, node, new_options, orig_options, name, "hidden")
-
-        return
-    for child in node.children:
-        update_hidden(child, point_to_options, name)
-
-
-def get_square_idx(row, col):
-    return row // 3 * 3 + col // 3
-
-
-def get_square_points(row, col):
-    square_start_row = row - (row % 3)
-    square_start_col = col - (col % 3)
-    for i in range(3):
-        row = square_start_row + i
-        for j in range(3):
-            col = square_start_col + j
-            yield row, col
-
-
-def get_row_col_from_square_id(idx):
-    row = (idx // 3) * 3
-    col = (idx % 3) * 3
-    return row, col
-
-
-def get_relevant_points(row, col):
-    for i in range(9):
-        if i != row:
-            yield i, col
-        if i != col:
-            yield row, i
-    for i, j in get_square_points(row, col):
-        if i != row and j != col:
-            yield i, j
+def update_hidden(trace: SolveTrace, subset: Subset, candidates, cells, unit):
+    masks = candidates.masks
+    for pos, cell in enumerate(cells):
+        if not subset.points >> pos & 1 or not masks[cell] & ~subset.options:
+            continue
+        removed = candidates.eliminate(cell, ~subset.options)
+        update_move(trace, cell, subset, masks[cell], removed, unit, HIDDEN)
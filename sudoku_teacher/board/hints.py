@@ -0,0 +1,57 @@
+from typing import NamedTuple, Optional
+
+from sudoku_teacher.board.board_index import INTERSECTIONS
+from sudoku_teacher.board.board_solver import BoardSolver
+from sudoku_teacher.board.grading import SUBSET_NAMES, TECHNIQUES
+from sudoku_teacher.board.helper import update_hidden, update_naked
+from sudoku_teacher.board.trace import SolveTrace
+
+SUBSET_SIZES = {name: size for size, name in SUBSET_NAMES.items()}
+
+
+class Hint(NamedTuple):
+    technique: str
+    trace: SolveTrace
+
+
+def iter_technique_steps(bs: BoardSolver, technique: str):
+    """Apply technique one subset or intersection at a time, yielding after
+    each."""
+    if technique == "intersection":
+        for idx in range(len(INTERSECTIONS)):
+            bs.intersections.handle_intersection(idx)
+            yield
+        return
+    kind, size_name = technique.split()
+    size = SUBSET_SIZES[size_name]
+    for group in bs.units:
+        if kind == "naked":
+            for subset in group.naked_subsets(size):
+                update_naked(bs.trace, subset, bs.candidates, group.cells, group.unit)
+                yield
+        else:
+            for subset in group.hidden_subsets(size):
+                update_hidden(bs.trace, subset, bs.candidates, group.cells, group.unit)
+                yield
+
+
+def apply_cheapest_step(bs: BoardSolver) -> Optional[str]:
+    """Apply the first step the cheapest technique finds and return that
+    technique, None if no technique finds one."""
+    recorded = len(bs.trace)
+    for technique in TECHNIQUES[1:]:
+        for _ in iter_technique_steps(bs, technique):
+            if len(bs.trace) > recorded:
+                return technique
+    return None
+
+
+def next_hint(board, check_mode=None) -> Optional[Hint]:
+    """The first step the cheapest technique finds on board, None if none
+    does. The givens are applied first, their steps are not part of the
+    hint, and nothing past the hint is solved."""
+    bs = BoardSolver(board, check_mode)
+    bs.eliminate_options_according_to_board()
+    bs.trace.clear()
+    technique = apply_cheapest_step(bs)
+    return Hint(technique, bs.trace) if technique is not None else None
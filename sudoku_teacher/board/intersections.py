@@ -0,0 +1,95 @@
+from sudoku_teacher.board.board_index import (
+    CELL_INTERSECTIONS,
+    INTERSECTIONS,
+    INTERSECTION_LINE_REST,
+    INTERSECTION_LINE_SIBLINGS,
+    INTERSECTION_SQUARE_REST,
+    INTERSECTION_SQUARE_SIBLINGS,
+    UNIT_INTERSECTIONS,
+)
+from sudoku_teacher.board.candidates import CandidateStore
+from sudoku_teacher.board.helper import update_move
+from sudoku_teacher.board.trace import CLAIMING, POINTING, SolveTrace
+
+
+class Intersections:
+    """Running candidate masks of the 54 square/line intersections.
+
+    The rest of a line, or of a square, outside an intersection is covered by
+    two sibling intersections, so the masks of the rest of each unit are a
+    single OR away. ``cell_changed`` must be called whenever a cell's
+    candidates change.
+    """
+
+    def __init__(self, candidates: CandidateStore, trace: SolveTrace):
+        self.candidates = candidates
+        self.trace = trace
+        self.masks = [0] * len(INTERSECTIONS)
+        self.refresh_all()
+
+    def refresh_all(self):
+        for idx in range(len(INTERSECTIONS)):
+            self.refresh(idx)
+
+    def refresh(self, idx):
+        masks = self.candidates.masks
+        a, b, c = INTERSECTIONS[idx][2]
+        self.masks[idx] = masks[a] | masks[b] | masks[c]
+
+    def cell_changed(self, cell):
+        for idx in CELL_INTERSECTIONS[cell]:
+            self.refresh(idx)
+
+    def line_rest(self, idx):
+        a, b = INTERSECTION_LINE_SIBLINGS[idx]
+        return self.masks[a] | self.masks[b]
+
+    def square_rest(self, idx):
+        a, b = INTERSECTION_SQUARE_SIBLINGS[idx]
+        return self.masks[a] | self.masks[b]
+
+    def handle_unit(self, unit):
+        for idx in UNIT_INTERSECTIONS[unit]:
+            self.handle_intersection(idx)
+
+    def handle_intersection(self, idx):
+        square_unit, line_unit, _ = INTERSECTIONS[idx]
+        if not self.masks[idx]:
+            return
+        # pointing: values of the square only found on this line
+        pointing = self.masks[idx] & self.line_rest(idx) & ~self.square_rest(idx)
+        if pointing:
+            self.remove(
+                INTERSECTION_LINE_REST[idx],
+                pointing,
+                line_unit,
+                square_unit,
+                POINTING,
+            )
+        # claiming: values of the line only found in this square
+        claiming = self.masks[idx] & self.square_rest(idx) & ~self.line_rest(idx)
+        if claiming:
+            self.remove(
+                INTERSECTION_SQUARE_REST[idx],
+                claiming,
+                square_unit,
+                line_unit,
+                CLAIMING,
+            )
+
+    def remove(self, cells, values, unit, reason_unit, kind):
+        masks = self.candidates.masks
+        for cell in cells:
+            if not masks[cell] & values:
+                continue
+            removed = self.candidates.eliminate(cell, values)
+            update_move(
+                self.trace,
+                cell=cell,
+                node=None,
+                new_options=masks[cell],
+                removed_options=removed,
+                unit=unit,
+                kind=kind,
+                neighbor=reason_unit,
+            )
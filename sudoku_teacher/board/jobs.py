@@ -0,0 +1,76 @@
+from typing import List, Optional, Tuple
+
+from sudoku_teacher.board.board_solver import BoardSolver
+from sudoku_teacher.board.candidates import POPCOUNT, Contradiction
+from sudoku_teacher.board.canonical import canonicalize
+from sudoku_teacher.board.grading import Grade, grade_trace
+from sudoku_teacher.board.hints import apply_cheapest_step, next_hint
+from sudoku_teacher.board.packing import pack_board, unpack_board
+from sudoku_teacher.board.solve_cache import puzzle_fingerprint
+
+# Solves as run by the views and the solve service. They only need the
+# settings, not the models, so they can run in bare worker processes.
+
+# Solve contents are the contradiction cell, NO_CONTRADICTION for none,
+# followed by the binary trace of the solve.
+NO_CONTRADICTION = 255
+
+
+def solve_content(board) -> bytes:
+    bs = BoardSolver(board)
+    cell = NO_CONTRADICTION
+    try:
+        bs.solve_board()
+    except Contradiction as e:
+        cell = e.cell
+    return bytes((cell,)) + bs.trace.to_bytes()
+
+
+def is_solved(bs: BoardSolver) -> bool:
+    masks = bs.candidates.masks
+    return all(
+        bs.board[cell // 9][cell % 9] or POPCOUNT[masks[cell]] == 1
+        for cell in range(81)
+    )
+
+
+def grade_board(board) -> Grade:
+    # A board is graded by the techniques a solver needs that always uses the
+    # cheapest one that makes progress, unlike solve_board.
+    bs = BoardSolver(board)
+    try:
+        bs.eliminate_options_according_to_board()
+        while apply_cheapest_step(bs) is not None:
+            pass
+    except Contradiction:
+        return grade_trace(bs.trace, solved=False)
+    return grade_trace(bs.trace, solved=is_solved(bs))
+
+
+def hint_content(board) -> Optional[Tuple[str, bytes]]:
+    # The technique and binary trace of the next step, so only bytes cross
+    # back from a worker process.
+    hint = next_hint(board)
+    if hint is None:
+        return None
+    return hint.technique, hint.trace.to_bytes()
+
+
+def grade_packed_boards(packed: List[bytes]) -> List[Grade]:
+    return [grade_board(unpack_board(data)) for data in packed]
+
+
+def canonical_packed_boards(packed: List[bytes]) -> List[Tuple[str, bytes]]:
+    """The fingerprint and packed canonical board of every packed board."""
+    result = []
+    for data in packed:
+        canonical, _ = canonicalize(unpack_board(data))
+        result.append((puzzle_fingerprint(canonical), pack_board(canonical)))
+    return result
+
+
+def solve_packed_boards(packed: List[bytes]) -> List[bytes]:
+    return [solve_content(unpack_board(data)) for data in packed]
+
+
+JOBS = {"solve": solve_content, "grade": grade_board, "hint": hint_content}
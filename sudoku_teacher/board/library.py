@@ -0,0 +1,116 @@
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Iterator, Tuple
+
+from sudoku_teacher.board.packing import PACKED_SIZE, pack_board, unpack_board
+
+# A packed library is a header, a table of its levels and then every board
+# packed into PACKED_SIZE bytes, level after level, each in id order. Level
+# entries hold the level name, null padded, the index of its first board and
+# its board count, little endian.
+LIBRARY_VERSION = 1
+LIBRARY_MAGIC = b"SLIB"
+LIBRARY_HEADER = struct.Struct("<4sBBxxI")
+LEVEL_ENTRY = struct.Struct("<16sII")
+MAX_LEVELS = 255
+
+
+class PackedLibrary:
+    """Read only view of a packed library through mmap.
+
+    Opening it reads only the header and the level table, boards are read
+    from the mapping when asked for, so opening is as cheap for millions of
+    boards as for a few.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < LIBRARY_HEADER.size:
+                raise ValueError(f"{path} is not a packed library")
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.levels = self._read_levels(size)
+        except ValueError:
+            self.close()
+            raise
+
+    def _read_levels(self, size) -> Dict[str, Tuple[int, int]]:
+        magic, version, level_count, total = LIBRARY_HEADER.unpack_from(self.data)
+        if magic != LIBRARY_MAGIC or version != LIBRARY_VERSION:
+            raise ValueError(f"{self.path} is not a version {LIBRARY_VERSION} library")
+        self.boards_offset = LIBRARY_HEADER.size + level_count * LEVEL_ENTRY.size
+        if size != self.boards_offset + total * PACKED_SIZE:
+            raise ValueError(f"{self.path} is truncated")
+        levels = {}
+        for idx in range(level_count):
+            name, first, count = LEVEL_ENTRY.unpack_from(
+                self.data, LIBRARY_HEADER.size + idx * LEVEL_ENTRY.size
+            )
+            if first + count > total:
+                raise ValueError(f"{self.path} has an invalid level table")
+            levels[name.rstrip(b"\0").decode()] = (first, count)
+        return levels
+
+    def __len__(self):
+        return sum(count for _, count in self.levels.values())
+
+    def count(self, level: str) -> int:
+        return self.levels[level][1] if level in self.levels else 0
+
+    def packed(self, level: str, sudoku_id: int) -> bytes:
+        first, count = self.levels[level]
+        if not 0 <= sudoku_id < count:
+            raise IndexError(f"no puzzle {sudoku_id} in level {level}")
+        offset = self.boards_offset + (first + sudoku_id) * PACKED_SIZE
+        return self.data[offset : offset + PACKED_SIZE]
+
+    def board(self, level: str, sudoku_id: int):
+        return unpack_board(self.packed(level, sudoku_id))
+
+    def __iter__(self) -> Iterator[Tuple[str, int, list]]:
+        for level, (_, count) in self.levels.items():
+            for sudoku_id in range(count):
+                yield level, sudoku_id, self.board(level, sudoku_id)
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_library(path: str, levels: Dict[str, Iterable[list]]) -> int:
+    """Write the boards of every level, in id order, to a packed library at
+    path and return how many were written. Boards are streamed to the file,
+    the level table is filled in once they are all written."""
+    if len(levels) > MAX_LEVELS:
+        raise ValueError(f"a library holds at most {MAX_LEVELS} levels")
+    names = [name.encode() for name in levels]
+    if any(not name or len(name) > 16 for name in names):
+        raise ValueError("level names are 1 to 16 bytes long")
+    table = []
+    total = 0
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.seek(LIBRARY_HEADER.size + len(levels) * LEVEL_ENTRY.size)
+        for name, boards in zip(names, levels.values()):
+            first = total
+            for board in boards:
+                f.write(pack_board(board))
+                total += 1
+            table.append(LEVEL_ENTRY.pack(name, first, total - first))
+        f.seek(0)
+        f.write(
+            LIBRARY_HEADER.pack(LIBRARY_MAGIC, LIBRARY_VERSION, len(levels), total)
+        )
+        f.writelines(table)
+    # readers never see a half written library
+    os.replace(tmp_path, path)
+    return total
+
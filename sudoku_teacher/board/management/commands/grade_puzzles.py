@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from sudoku_teacher.board.grader import GradeProgress, grade_puzzles
+from sudoku_teacher.board.workers import add_jobs_argument, worker_pool
+
+
+class Command(BaseCommand):
+    help = (
+        "Grade the puzzles not graded by this solver version, by the hardest "
+        "technique their solve needs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--level", help="Only grade puzzles of this level.")
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Grade again puzzles already graded by this solver version.",
+        )
+        add_jobs_argument(parser, "Worker processes, 1 grades in this process.")
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def report(self, progress: GradeProgress):
+        self.stdout.write(
+            f"{progress.graded} graded, {progress.unsolved} unsolved, "
+            f"{progress.rate:.0f} puzzles/s"
+        )
+
+    def handle(self, *args, **options):
+        with worker_pool(options["jobs"]) as executor:
+            progress = grade_puzzles(
+                level=options["level"],
+                force=options["force"],
+                chunk_size=options["chunk_size"],
+                executor=executor,
+                max_pending=2 * options["jobs"],
+                progress=self.report,
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Graded {progress.graded} puzzles in {progress.seconds:.1f}s "
+                f"({progress.rate:.0f} puzzles/s)"
+            )
+        )
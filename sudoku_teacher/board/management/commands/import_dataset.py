@@ -0,0 +1,57 @@
+import gzip
+import sys
+
+from django.core.management.base import BaseCommand
+
+from sudoku_teacher.board.dataset import DatasetProgress, import_dataset
+from sudoku_teacher.board.workers import add_jobs_argument, worker_pool
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a dataset of one puzzle per line, 81 characters with . or 0 "
+        "for blanks, as puzzles of a level."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Dataset file, .gz for gzip, - for stdin.")
+        parser.add_argument("--level", default="imported")
+        add_jobs_argument(parser, "Worker processes, 1 fingerprints in this process.")
+        parser.add_argument("--chunk-size", type=int, default=10000)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def report(self, progress: DatasetProgress):
+        self.stdout.write(
+            f"{progress.lines} lines, {progress.imported} imported, "
+            f"{progress.duplicates} duplicates, {progress.invalid} invalid, "
+            f"{progress.rate:.0f} lines/s"
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if path == "-":
+            f = sys.stdin.buffer
+        elif path.endswith(".gz"):
+            f = gzip.open(path, "rb")
+        else:
+            f = open(path, "rb")
+        try:
+            with worker_pool(options["jobs"]) as executor:
+                progress = import_dataset(
+                    f,
+                    options["level"],
+                    chunk_size=options["chunk_size"],
+                    batch_size=options["batch_size"],
+                    executor=executor,
+                    max_pending=2 * options["jobs"],
+                    progress=self.report,
+                )
+        finally:
+            if f is not sys.stdin.buffer:
+                f.close()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {progress.imported} puzzles from {progress.lines} lines "
+                f"in {progress.seconds:.1f}s ({progress.rate:.0f} lines/s)"
+            )
+        )
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from sudoku_teacher.board.puzzles import import_puzzles
+from sudoku_teacher.board.sudoku_loader import iter_level, library_levels
+
+
+class Command(BaseCommand):
+    help = "Import the puzzle text files of the library as puzzles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        imported = duplicates = 0
+        for level in library_levels():
+            boards = (board for _, board in iter_level(level))
+            result = import_puzzles(boards, level, options["batch_size"])
+            imported += result.imported
+            duplicates += result.duplicates
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} puzzles ({duplicates} duplicates skipped) "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+        )
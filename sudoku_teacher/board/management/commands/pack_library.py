@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sudoku_teacher.board.library import write_library
+from sudoku_teacher.board.sudoku_loader import (
+    LIBRARY_FILE,
+    iter_level,
+    level_ids,
+    library_levels,
+)
+
+
+class Command(BaseCommand):
+    help = "Pack the puzzle text files of the library into a single file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=LIBRARY_FILE)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        levels = {}
+        for level in library_levels():
+            ids = level_ids(level)
+            # boards are stored by position, so ids must have no gaps
+            if ids != list(range(len(ids))):
+                raise CommandError(f"the ids of level {level} are not 0 to n - 1")
+            levels[level] = (board for _, board in iter_level(level))
+        try:
+            total = write_library(options["output"], levels)
+        except ValueError as e:
+            raise CommandError(e)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Packed {total} puzzles of {len(levels)} levels into "
+                f"{options['output']} in {time.monotonic() - started:.1f}s"
+            )
+        )
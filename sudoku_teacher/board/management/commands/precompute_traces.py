@@ -0,0 +1,136 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from sudoku_teacher.board.jobs import canonical_packed_boards, solve_packed_boards
+from sudoku_teacher.board.models import Puzzle
+from sudoku_teacher.board.packing import pack_board, unpack_board
+from sudoku_teacher.board.puzzles import chunked
+from sudoku_teacher.board.solve_cache import warm_cache
+from sudoku_teacher.board.sudoku_loader import get_library, iter_library
+from sudoku_teacher.board.trace_store import (
+    store_contents,
+    stored_contents,
+    stored_fingerprints,
+)
+from sudoku_teacher.board.workers import (
+    add_jobs_argument,
+    imap_chunks,
+    map_chunks,
+    worker_pool,
+)
+
+SOURCES = ("files", "library", "puzzles")
+
+
+def iter_packed_boards(sources, chunk_size: int):
+    """The packed boards of the puzzle files, the packed library and the
+    Puzzle table, those of sources."""
+    if "files" in sources:
+        for _, _, board in iter_library():
+            yield pack_board(board)
+    library, _ = get_library() if "library" in sources else (None, None)
+    if library is not None:
+        for level in library.levels:
+            for sudoku_id in range(library.count(level)):
+                yield library.packed(level, sudoku_id)
+    if "puzzles" in sources:
+        last_pk = 0
+        while True:
+            rows = Puzzle.objects.filter(pk__gt=last_pk).order_by("pk")
+            rows = list(rows.values_list("pk", "packed")[:chunk_size])
+            if not rows:
+                return
+            last_pk = rows[-1][0]
+            for _, data in rows:
+                yield bytes(data)
+
+
+class Command(BaseCommand):
+    help = (
+        "Solve every puzzle of the library files, the packed library and the "
+        "puzzle table, and store its trace."
+    )
+
+    def add_arguments(self, parser):
+        add_jobs_argument(parser, "Worker processes, 1 solves in this process.")
+        parser.add_argument(
+            "--source",
+            action="append",
+            choices=SOURCES,
+            help="Only solve the puzzles of this source, may be repeated.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Solve again puzzles already stored for this solver.",
+        )
+        parser.add_argument(
+            "--warm-cache",
+            action="store_true",
+            help="Also put the traces in the solve cache.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        force, warm = options["force"], options["warm_cache"]
+        puzzles = skipped = stored = 0
+
+        def solve_chunks(canonical_chunks):
+            # Equivalent puzzles share the trace of their canonical board.
+            # Stored ones are skipped, except for chunks still in flight.
+            nonlocal puzzles, skipped
+            for _, boards in canonical_chunks:
+                puzzles += len(boards)
+                boards = dict(boards)
+                if not force:
+                    known = stored_fingerprints(boards)
+                    skipped += len(known)
+                    if warm and known:
+                        self.warm(boards, stored_contents(known))
+                    for fingerprint in known:
+                        del boards[fingerprint]
+                if boards:
+                    yield boards, list(boards.values())
+
+        def store(boards, contents):
+            nonlocal stored
+            contents = dict(zip(boards, contents))
+            store_contents(contents, replace=force)
+            stored += len(contents)
+            if warm:
+                self.warm(boards, contents)
+
+        chunk_size = options["chunk_size"]
+        boards = iter_packed_boards(options["source"] or SOURCES, chunk_size)
+        chunks = ((None, packed) for packed in chunked(boards, chunk_size))
+        with worker_pool(options["jobs"]) as executor:
+            max_pending = 2 * options["jobs"]
+            canonical_chunks = imap_chunks(
+                canonical_packed_boards, chunks, executor, max_pending
+            )
+            map_chunks(
+                solve_packed_boards,
+                solve_chunks(canonical_chunks),
+                store,
+                executor,
+                max_pending,
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Stored {stored} traces for {puzzles} puzzles "
+                f"({skipped} already stored) "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+        )
+
+    def warm(self, boards, contents):
+        warm_cache(
+            (
+                (unpack_board(boards[fingerprint]), content)
+                for fingerprint, content in contents.items()
+            ),
+            "trace",
+        )
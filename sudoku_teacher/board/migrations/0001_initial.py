@@ -0,0 +1,49 @@
+# Generated by Django 3.1.13 on 2026-10-18 13:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredTrace",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        max_length=32, verbose_name="Canonical fingerprint"
+                    ),
+                ),
+                (
+                    "solver_version",
+                    models.PositiveIntegerField(verbose_name="Solver version"),
+                ),
+                ("content", models.BinaryField(verbose_name="Content")),
+                (
+                    "created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created"),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="storedtrace",
+            constraint=models.UniqueConstraint(
+                fields=("fingerprint", "solver_version"),
+                name="unique_trace_per_solver_version",
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 3.1.13 on 2026-10-18 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("board", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Puzzle",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("level", models.CharField(max_length=16, verbose_name="Level")),
+                ("sequence", models.PositiveIntegerField(verbose_name="Sequence")),
+                (
+                    "packed",
+                    models.BinaryField(max_length=41, verbose_name="Packed board"),
+                ),
+                (
+                    "canonical_hash",
+                    models.CharField(
+                        max_length=32,
+                        unique=True,
+                        verbose_name="Canonical fingerprint",
+                    ),
+                ),
+                ("givens", models.PositiveSmallIntegerField(verbose_name="Givens")),
+                (
+                    "grade",
+                    models.PositiveSmallIntegerField(
+                        blank=True, null=True, verbose_name="Grade"
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created"),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="puzzle",
+            constraint=models.UniqueConstraint(
+                fields=("level", "sequence"), name="unique_puzzle_sequence_per_level"
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.1.13 on 2026-10-18 13:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("board", "0002_puzzle"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="puzzle",
+            name="graded_version",
+            field=models.PositiveIntegerField(
+                blank=True, null=True, verbose_name="Graded with solver version"
+            ),
+        ),
+        migrations.AddField(
+            model_name="puzzle",
+            name="technique_counts",
+            field=models.JSONField(
+                blank=True, null=True, verbose_name="Technique counts"
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.1.13 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("board", "0003_puzzle_grading"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="storedtrace",
+            name="unique_trace_per_solver_version",
+        ),
+        migrations.AddField(
+            model_name="storedtrace",
+            name="variant",
+            field=models.CharField(
+                default="", max_length=32, verbose_name="Solver variant"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="storedtrace",
+            constraint=models.UniqueConstraint(
+                fields=("fingerprint", "solver_version", "variant"),
+                name="unique_trace_per_solver_variant",
+            ),
+        ),
+    ]
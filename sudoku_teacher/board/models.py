@@ -1,3 +1,92 @@
+import random
+from typing import Optional
+
 from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from sudoku_teacher.board.packing import PACKED_SIZE, unpack_board
+
+
+class StoredTrace(models.Model):
+    """Precomputed solve of a canonical board, see ``trace_store``."""
+
+    fingerprint = models.CharField(_("Canonical fingerprint"), max_length=32)
+    solver_version = models.PositiveIntegerField(_("Solver version"))
+    #: The solver settings it was solved with, see ``solve_cache.solver_variant``.
+    variant = models.CharField(_("Solver variant"), max_length=32, default="")
+    #: The contradiction cell, 255 for none, followed by the binary trace.
+    content = models.BinaryField(_("Content"))
+    created = models.DateTimeField(_("Created"), auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["fingerprint", "solver_version", "variant"],
+                name="unique_trace_per_solver_variant",
+            )
+        ]
+
+
+class PuzzleQuerySet(models.QuerySet):
+    def level_count(self, level: str) -> int:
+        # sequences are dense, the max comes from the (level, sequence) index
+        last = self.filter(level=level).aggregate(last=models.Max("sequence"))
+        return 0 if last["last"] is None else last["last"] + 1
+
+    def by_level(self, level: str, sequence: int) -> "Puzzle":
+        return self.get(level=level, sequence=sequence)
+
+    def random(self, level: Optional[str] = None) -> "Puzzle":
+        """A random puzzle of level, or of any level, in a few index lookups
+        instead of ``ORDER BY random()``."""
+        if level is not None:
+            count = self.level_count(level)
+            if not count:
+                raise self.model.DoesNotExist(f"no puzzles of level {level}")
+            return self.by_level(level, random.randrange(count))
+        # ids have gaps only where puzzles were deleted, which slightly favors
+        # the puzzles after them
+        bounds = self.aggregate(low=models.Min("pk"), high=models.Max("pk"))
+        if bounds["low"] is None:
+            raise self.model.DoesNotExist("no puzzles")
+        pk = random.randint(bounds["low"], bounds["high"])
+        return self.filter(pk__gte=pk).order_by("pk").first()
+
+
+class Puzzle(models.Model):
+    """A library puzzle, see ``puzzles`` for importing them."""
+
+    level = models.CharField(_("Level"), max_length=16)
+    #: Dense position of the puzzle in its level, from 0.
+    sequence = models.PositiveIntegerField(_("Sequence"))
+    #: The board packed by ``packing.pack_board``.
+    packed = models.BinaryField(_("Packed board"), max_length=PACKED_SIZE)
+    canonical_hash = models.CharField(
+        _("Canonical fingerprint"), max_length=32, unique=True
+    )
+    givens = models.PositiveSmallIntegerField(_("Givens"))
+    #: Level of the hardest technique its solve needs, see ``grading``.
+    grade = models.PositiveSmallIntegerField(_("Grade"), null=True, blank=True)
+    #: Steps of the solve made by every technique, in ``TECHNIQUES`` order.
+    technique_counts = models.JSONField(_("Technique counts"), null=True, blank=True)
+    #: Solver version the grade was computed with, see ``grader``.
+    graded_version = models.PositiveIntegerField(
+        _("Graded with solver version"), null=True, blank=True
+    )
+    created = models.DateTimeField(_("Created"), auto_now_add=True)
+
+    objects = PuzzleQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["level", "sequence"], name="unique_puzzle_sequence_per_level"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.level} {self.sequence}"
 
-# Create your models here.
+    @property
+    def board(self):
+        return unpack_board(bytes(self.packed))
@@ -0,0 +1,23 @@
+from typing import List
+
+# A board packs into 41 bytes, two cells per byte, high nibble first; the
+# low nibble of the last byte is unused.
+PACKED_SIZE = 41
+
+
+def pack_board(board) -> bytes:
+    cells = [value for row in board for value in row] + [0]
+    if len(cells) != 82 or not all(0 <= value <= 9 for value in cells):
+        raise ValueError("a board is 9 rows of 9 values from 0 to 9")
+    return bytes(cells[i] << 4 | cells[i + 1] for i in range(0, 82, 2))
+
+
+def unpack_board(data: bytes) -> List[List[int]]:
+    if len(data) != PACKED_SIZE:
+        raise ValueError(f"a packed board is {PACKED_SIZE} bytes, got {len(data)}")
+    cells = []
+    for byte in data:
+        cells += (byte >> 4, byte & 0xF)
+    if any(value > 9 for value in cells) or cells[81]:
+        raise ValueError("invalid packed board")
+    return [cells[row * 9 : row * 9 + 9] for row in range(9)]
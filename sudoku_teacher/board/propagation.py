@@ -0,0 +1,62 @@
+from collections import deque
+from typing import Callable, List, Optional
+
+from sudoku_teacher.board.board_group import BoardGroup
+from sudoku_teacher.board.board_index import CELL_UNITS
+from sudoku_teacher.board.intersections import Intersections
+
+
+class Propagator:
+    """Runs the unit rules until no unit has pending changes.
+
+    A unit is queued at most once at a time, and only when one of its cells
+    loses a candidate, so the work done is proportional to the number of
+    eliminations rather than to the length of the trace. ``check``, when
+    given, is called after every unit, e.g. to sweep the board invariants.
+    ``intersections``, when given, has its running masks kept up to date.
+    """
+
+    def __init__(
+        self,
+        units: List[BoardGroup],
+        check: Optional[Callable[[], None]] = None,
+        intersections: Optional[Intersections] = None,
+    ):
+        self.units = units
+        self.check = check
+        self.intersections = intersections
+        self.queue = deque()
+        self.queued = [False] * len(units)
+
+    def mark_unit(self, unit):
+        if not self.queued[unit]:
+            self.queued[unit] = True
+            self.queue.append(unit)
+
+    def mark_cell(self, cell):
+        for unit in CELL_UNITS[cell]:
+            self.mark_unit(unit)
+
+    def cell_changed(self, cell):
+        if self.intersections is not None:
+            self.intersections.cell_changed(cell)
+        self.mark_cell(cell)
+
+    def mark_all(self):
+        for unit in range(len(self.units)):
+            self.mark_unit(unit)
+
+    def step(self):
+        unit = self.queue.popleft()
+        self.queued[unit] = False
+        group = self.units[unit]
+        group.handle_naked_subset()
+        group.handle_hidden_subset()
+        group.handle_pointing_subset()
+        if self.check is not None:
+            self.check()
+        return unit
+
+    def run(self):
+        while self.queue:
+            self.step()
@@ -0,0 +1,73 @@
+import itertools
+from typing import Iterable, Iterator, List, NamedTuple
+
+from django.db import transaction
+
+from sudoku_teacher.board.canonical import canonical_fingerprint
+from sudoku_teacher.board.models import Puzzle
+from sudoku_teacher.board.packing import pack_board
+
+
+class ImportResult(NamedTuple):
+    imported: int
+    duplicates: int
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def new_puzzle(board, level: str) -> Puzzle:
+    return Puzzle(
+        level=level,
+        packed=pack_board(board),
+        canonical_hash=canonical_fingerprint(board),
+        givens=sum(1 for row in board for value in row if value),
+    )
+
+
+class PuzzleWriter:
+    """Stores new puzzles of a level batch by batch, skipping puzzles
+    equivalent to one already stored in any level.
+
+    New puzzles get the next sequences of their level, so writers of a
+    level must not run concurrently.
+    """
+
+    def __init__(self, level: str, batch_size=1000):
+        self.level = level
+        self.batch_size = batch_size
+        self.sequence = Puzzle.objects.level_count(level)
+
+    def write(self, puzzles: Iterable[Puzzle]) -> ImportResult:
+        imported = duplicates = 0
+        for batch in chunked(puzzles, self.batch_size):
+            unique = {}
+            for puzzle in batch:
+                unique.setdefault(puzzle.canonical_hash, puzzle)
+            stored = set(
+                Puzzle.objects.filter(canonical_hash__in=list(unique)).values_list(
+                    "canonical_hash", flat=True
+                )
+            )
+            new = [puzzle for key, puzzle in unique.items() if key not in stored]
+            for puzzle in new:
+                puzzle.level = self.level
+                puzzle.sequence = self.sequence
+                self.sequence += 1
+            with transaction.atomic():
+                Puzzle.objects.bulk_create(new)
+            imported += len(new)
+            duplicates += len(batch) - len(new)
+        return ImportResult(imported, duplicates)
+
+
+def import_puzzles(boards: Iterable, level: str, batch_size=1000) -> ImportResult:
+    """Add boards to level, see ``PuzzleWriter``."""
+    writer = PuzzleWriter(level, batch_size)
+    return writer.write(new_puzzle(board, level) for board in boards)
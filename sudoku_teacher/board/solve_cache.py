@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import time
+import uuid
+from typing import Callable, Iterable, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from sudoku_teacher.board.board_solver import SOLVER_VERSION
+
+KEY_PREFIX = "board:solve"
+# How long a worker may hold the lock of a puzzle, and how often the others
+# look for its result meanwhile.
+LOCK_TIMEOUT = 30
+POLL_INTERVAL = 0.05
+# How long async views wait on the event loop for a puzzle another worker
+# renders, before rendering it themselves.
+ASYNC_WAIT_TIMEOUT = 2
+
+
+def puzzle_fingerprint(board) -> str:
+    digits = "".join(str(value) for row in board for value in row)
+    return hashlib.blake2b(digits.encode(), digest_size=16).hexdigest()
+
+
+def solver_variant() -> str:
+    # Besides the solver version, solves depend on the settings the solver
+    # runs with: whether contradictions are raised and how long traces get.
+    return "{}-{}".format(
+        getattr(settings, "BOARD_SOLVER_CHECK_MODE", "off"),
+        getattr(settings, "BOARD_SOLVER_MAX_TRACE_STEPS", ""),
+    )
+
+
+def solve_cache_key(board, fmt: str) -> str:
+    return ":".join(
+        (
+            KEY_PREFIX,
+            str(SOLVER_VERSION),
+            solver_variant(),
+            fmt,
+            puzzle_fingerprint(board),
+        )
+    )
+
+
+def get_cache():
+    return caches[getattr(settings, "BOARD_SOLVE_CACHE", "default")]
+
+
+def cache_timeout():
+    return getattr(settings, "BOARD_SOLVE_CACHE_TIMEOUT", None)
+
+
+def get_cached(board, fmt: str):
+    return get_cache().get(solve_cache_key(board, fmt))
+
+
+def warm_cache(items: Iterable[Tuple[list, bytes]], fmt: str):
+    """Store already rendered (board, content) pairs in the cache."""
+    get_cache().set_many(
+        {solve_cache_key(board, fmt): content for board, content in items},
+        cache_timeout(),
+    )
+
+
+def cached_solve(
+    board, fmt: str, render: Callable[[], bytes], wait: float = LOCK_TIMEOUT
+) -> bytes:
+    """Return the response bytes of board in fmt, rendering them on a miss.
+
+    Concurrent misses on the same puzzle are single-flight: the worker that
+    takes the puzzle's lock renders and stores the result, and the others
+    wait for it, up to ``wait`` seconds, before rendering it themselves.
+    """
+    cache = get_cache()
+    key = solve_cache_key(board, fmt)
+    content = cache.get(key)
+    if content is not None:
+        return content
+
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait
+    acquired = cache.add(lock_key, token, LOCK_TIMEOUT)
+    if acquired is None:
+        # django-redis returns None instead of raising when the server is
+        # down and IGNORE_EXCEPTIONS is set
+        return render()
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        content = cache.get(key)
+        if content is not None:
+            return content
+        acquired = cache.add(lock_key, token, LOCK_TIMEOUT)
+
+    try:
+        content = cache.get(key)
+        if content is None:
+            content = render()
+            cache.set(key, content, cache_timeout())
+        return content
+    finally:
+        if acquired and cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+async def await_cached(
+    board, fmt: str, timeout: float = ASYNC_WAIT_TIMEOUT
+) -> Optional[bytes]:
+    """The cached response bytes of board in fmt, waiting on the event loop
+    up to timeout while another worker holds the puzzle's lock. None when
+    the caller has to render them."""
+    cache = get_cache()
+    key = solve_cache_key(board, fmt)
+    lock_key = f"{key}:lock"
+    deadline = time.monotonic() + timeout
+    while True:
+        found = await sync_to_async(cache.get_many)([key, lock_key])
+        if key in found:
+            return found[key]
+        if lock_key not in found or time.monotonic() >= deadline:
+            return None
+        await asyncio.sleep(POLL_INTERVAL)
@@ -0,0 +1,202 @@
+import asyncio
+import atexit
+import multiprocessing
+import multiprocessing.connection
+import queue
+import threading
+import time
+from functools import partial
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+
+from sudoku_teacher.board.board_solver import BoardSolver
+from sudoku_teacher.board.executor import cancel_event
+from sudoku_teacher.board.jobs import JOBS
+from sudoku_teacher.board.packing import pack_board, unpack_board
+
+# Settings the jobs read, handed to the workers so they need not import the
+# project settings.
+SOLVER_SETTINGS = ("BOARD_SOLVER_CHECK_MODE", "BOARD_SOLVER_MAX_TRACE_STEPS")
+# How often a caller waiting for a worker checks its timeout and cancel event.
+POLL_INTERVAL = 0.01
+EMPTY_BOARD = [[0] * 9 for _ in range(9)]
+
+
+class SolveServiceError(Exception):
+    pass
+
+
+class SolveTimeout(SolveServiceError):
+    pass
+
+
+class SolveCancelled(SolveServiceError):
+    pass
+
+
+def _worker(conn, solver_settings):
+    if not settings.configured:
+        settings.configure(**solver_settings)
+    # build the index tables and warm the solver before taking jobs
+    BoardSolver(EMPTY_BOARD).solve_board()
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        job, data = message
+        try:
+            reply = ("ok", JOBS[job](unpack_board(data)))
+        except Exception as e:
+            reply = ("error", e)
+        conn.send(reply)
+
+
+class _Worker(NamedTuple):
+    process: multiprocessing.Process
+    conn: multiprocessing.connection.Connection
+
+
+class SolveService:
+    """A pool of worker processes running the solve jobs of ``JOBS``.
+
+    Boards travel packed and results come back as trace bytes, grades or
+    trace rows. A job that times out or is cancelled takes its worker down
+    with it, a fresh worker takes its place.
+    """
+
+    def __init__(
+        self, processes: int, timeout: Optional[float] = None, mp_context=None
+    ):
+        self.timeout = timeout
+        self.context = mp_context or multiprocessing.get_context("spawn")
+        self.solver_settings = {
+            name: getattr(settings, name)
+            for name in SOLVER_SETTINGS
+            if hasattr(settings, name)
+        }
+        self.lock = threading.Lock()
+        self.closed = False
+        self.workers = [self._start() for _ in range(processes)]
+        self.idle = queue.SimpleQueue()
+        for worker in self.workers:
+            self.idle.put(worker)
+
+    def _start(self) -> _Worker:
+        conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=_worker,
+            args=(child_conn, self.solver_settings),
+            name="board-solve-service",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, conn)
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        worker.process.kill()
+        worker.process.join()
+        worker.conn.close()
+        with self.lock:
+            if self.closed:
+                return worker
+            new_worker = self._start()
+            self.workers[self.workers.index(worker)] = new_worker
+        return new_worker
+
+    def run(self, job: str, board, timeout: Optional[float] = None, cancel=None):
+        """Run job on board and return its result.
+
+        ``timeout`` counts from the call, waiting for a free worker included,
+        and ``cancel`` is an optional ``threading.Event`` that aborts the job.
+        """
+        if job not in JOBS:
+            raise ValueError(f"unknown job {job!r}")
+        data = pack_board(board)
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout if timeout else None
+        if self.closed:
+            raise SolveServiceError("the solve service is closed")
+        try:
+            worker = self.idle.get(timeout=timeout or None)
+        except queue.Empty:
+            raise SolveTimeout(f"no free worker for {job} in {timeout}s")
+
+        try:
+            worker.conn.send((job, data))
+            while not worker.conn.poll(POLL_INTERVAL):
+                if cancel is not None and cancel.is_set():
+                    raise SolveCancelled(f"{job} cancelled")
+                if deadline is not None and time.monotonic() > deadline:
+                    raise SolveTimeout(f"{job} took more than {timeout}s")
+            status, result = worker.conn.recv()
+        except (EOFError, OSError):
+            worker = self._replace(worker)
+            raise SolveServiceError(f"the worker running {job} exited")
+        except BaseException:
+            worker = self._replace(worker)
+            raise
+        finally:
+            self.idle.put(worker)
+        if status == "error":
+            raise result
+        return result
+
+    async def arun(self, job: str, board, timeout: Optional[float] = None):
+        cancel = threading.Event()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                None, partial(self.run, job, board, timeout, cancel)
+            )
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+        for worker in self.workers:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+        for worker in self.workers:
+            worker.process.join(1)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+            worker.conn.close()
+
+
+_service: Optional[SolveService] = None
+_service_lock = threading.Lock()
+
+
+def get_solve_service() -> Optional[SolveService]:
+    """The shared service, None when BOARD_SOLVE_SERVICE_PROCESSES is 0."""
+    global _service
+    with _service_lock:
+        processes = getattr(settings, "BOARD_SOLVE_SERVICE_PROCESSES", 0)
+        if _service is None and processes:
+            _service = SolveService(
+                processes, getattr(settings, "BOARD_SOLVE_SERVICE_TIMEOUT", None)
+            )
+            atexit.register(_service.close)
+        return _service
+
+
+def run_job(job: str, board, timeout: Optional[float] = None):
+    """Run job on the shared service, or in this process without one.
+
+    Run in the solver executor, the job is cancelled, and its worker freed,
+    once the request waiting for it is cancelled.
+    """
+    service = get_solve_service()
+    if service is None:
+        return JOBS[job](board)
+    return service.run(job, board, timeout, cancel_event())
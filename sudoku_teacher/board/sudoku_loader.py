@@ -1,20 +1,188 @@
 import os
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import NamedTuple, Optional, Tuple
 
+from django.conf import settings
 
 from config.settings.base import STATICFILES_DIRS
+from sudoku_teacher.board.board_index import PEERS
+from sudoku_teacher.board.candidates import VALUE_TO_BIT, CandidateStore
+from sudoku_teacher.board.library import PackedLibrary
 
 LEVEL = "medium"
-LEVEL_PATH = os.path.join(STATICFILES_DIRS[0], "sudoku", "{level}")
+LIBRARY_PATH = os.path.join(STATICFILES_DIRS[0], "sudoku")
+LEVEL_PATH = os.path.join(LIBRARY_PATH, "{level}")
 SUDOKU_ID = 0
+# Built from the text files by the pack_library command, and used in their
+# place when present.
+LIBRARY_FILE = os.path.join(LIBRARY_PATH, "library.pack")
 
 
 class Sudoku:
     def __init__(self):
-        self.board = []
-        dir_path = LEVEL_PATH.format(level=LEVEL)
-        with open(os.path.join(dir_path, f"{SUDOKU_ID}.txt")) as f:
-            lines = f.read().splitlines()
-            for i in range(9):
-                self.board.append([])
-                for j in range(9):
-                    self.board[-1].append(int(lines[i][j]))
+        board, masks = load_puzzle(LEVEL, SUDOKU_ID)
+        self.board = [list(row) for row in board]
+        # candidates left by the givens
+        self.candidates = CandidateStore(masks)
+
+
+def read_board(path):
+    with open(path) as f:
+        lines = f.read().splitlines()
+    return [[int(lines[i][j]) for j in range(9)] for i in range(9)]
+
+
+def library_levels():
+    return [
+        level
+        for level in sorted(os.listdir(LIBRARY_PATH))
+        if os.path.isdir(LEVEL_PATH.format(level=level))
+    ]
+
+
+def level_ids(level):
+    names = os.listdir(LEVEL_PATH.format(level=level))
+    return sorted(int(name[:-4]) for name in names if name.endswith(".txt"))
+
+
+def iter_level(level):
+    """Yield (sudoku_id, board) for every puzzle file of level."""
+    dir_path = LEVEL_PATH.format(level=level)
+    for sudoku_id in level_ids(level):
+        yield sudoku_id, read_board(os.path.join(dir_path, f"{sudoku_id}.txt"))
+
+
+def iter_library():
+    """Yield (level, sudoku_id, board) for every puzzle file of the library."""
+    for level in library_levels():
+        for sudoku_id, board in iter_level(level):
+            yield level, sudoku_id, board
+
+
+def file_stamp(path) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+_library: Optional[PackedLibrary] = None
+_library_stamp: Optional[Tuple[int, int]] = None
+_library_lock = threading.Lock()
+
+
+def get_library() -> Tuple[Optional[PackedLibrary], Optional[Tuple[int, int]]]:
+    """The packed library and the stamp of its file, (None, None) when not
+    built. It is opened once per process and again whenever the file
+    changes, and the two always belong together."""
+    global _library, _library_stamp
+    try:
+        stamp = file_stamp(LIBRARY_FILE)
+    except FileNotFoundError:
+        stamp = None
+    with _library_lock:
+        if stamp is None:
+            _library = _library_stamp = None
+        elif _library is None or stamp != _library_stamp:
+            # readers of the previous library keep their mapping until they
+            # drop it
+            _library, _library_stamp = PackedLibrary(LIBRARY_FILE), stamp
+        return _library, _library_stamp
+
+
+def initial_masks(board) -> Tuple[int, ...]:
+    masks = list(CandidateStore.from_board(board).masks)
+    for cell in range(81):
+        value = board[cell // 9][cell % 9]
+        if value:
+            for peer in PEERS[cell]:
+                masks[peer] &= ~VALUE_TO_BIT[value]
+    return tuple(masks)
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    invalidations: int
+    maxsize: int
+    currsize: int
+
+
+class BoardCache:
+    """LRU of parsed boards and their initial candidates.
+
+    Entries carry the stamp of their source, e.g. the mtime and size of its
+    file, and an entry whose source has a different stamp is loaded again.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.invalidations = 0
+
+    def get(self, key, stamp, load):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] == stamp:
+                    self.hits += 1
+                    self.entries.move_to_end(key)
+                    return entry[1:]
+                del self.entries[key]
+                self.invalidations += 1
+            self.misses += 1
+        board = tuple(tuple(row) for row in load())
+        entry = (stamp, board, initial_masks(board))
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return entry[1:]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def info(self) -> CacheInfo:
+        with self.lock:
+            return CacheInfo(
+                self.hits,
+                self.misses,
+                self.invalidations,
+                self.maxsize,
+                len(self.entries),
+            )
+
+
+_board_cache: Optional[BoardCache] = None
+_board_cache_lock = threading.Lock()
+
+
+def get_board_cache() -> BoardCache:
+    global _board_cache
+    with _board_cache_lock:
+        if _board_cache is None:
+            _board_cache = BoardCache(
+                getattr(settings, "BOARD_LOADER_CACHE_SIZE", 256)
+            )
+        return _board_cache
+
+
+def load_puzzle(level, sudoku_id):
+    """The board of a library puzzle as a tuple of rows, and the candidate
+    masks its givens leave, from the board cache."""
+    library, library_stamp = get_library()
+    if library is not None and sudoku_id < library.count(level):
+        stamp = ("pack",) + library_stamp
+        load = partial(library.board, level, sudoku_id)
+    else:
+        path = os.path.join(LEVEL_PATH.format(level=level), f"{sudoku_id}.txt")
+        stamp = ("text",) + file_stamp(path)
+        load = partial(read_board, path)
+    return get_board_cache().get((level, sudoku_id), stamp, load)
+
+
+def board_cache_info() -> CacheInfo:
+    return get_board_cache().info()
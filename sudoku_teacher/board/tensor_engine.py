@@ -0,0 +1,163 @@
+import numpy as np
+
+from sudoku_teacher.board.candidates import ALL_OPTIONS
+
+# Candidate tensors are boolean arrays of shape (..., 9, 9, 9) indexed by
+# [row, col, value - 1]; any leading dimensions are batches of boards.
+
+# MASK_BITS[mask] is the boolean candidate vector of a 9-bit mask.
+MASK_BITS = (np.arange(ALL_OPTIONS + 1)[:, None] >> np.arange(9) & 1).astype(bool)
+BIT_WEIGHTS = 1 << np.arange(9)
+VALUES = np.arange(1, 10)
+
+
+def masks_to_tensor(masks):
+    masks = np.asarray(masks)
+    return MASK_BITS[masks.reshape(masks.shape[:-1] + (9, 9))]
+
+
+def tensor_to_masks(tensor):
+    masks = (tensor * BIT_WEIGHTS).sum(axis=-1)
+    return masks.reshape(masks.shape[:-2] + (81,))
+
+
+def board_to_tensor(board):
+    board = np.asarray(board)
+    tensor = np.ones(board.shape + (9,), dtype=bool)
+    tensor[board > 0] = False
+    return eliminate_peers(tensor, board)
+
+
+def _squares(tensor):
+    # (..., 9, 9, 9) -> (..., band, row in band, stack, col in stack, 9)
+    return tensor.reshape(tensor.shape[:-3] + (3, 3, 3, 3, 9))
+
+
+def _expand_squares(per_square):
+    # (..., 3, 3, 9) -> (..., 9, 9, 9)
+    return np.repeat(np.repeat(per_square, 3, axis=-3), 3, axis=-2)
+
+
+def row_counts(tensor):
+    return tensor.sum(axis=-2)
+
+
+def col_counts(tensor):
+    return tensor.sum(axis=-3)
+
+
+def square_counts(tensor):
+    return _squares(tensor).sum(axis=(-4, -2))
+
+
+def naked_singles(tensor):
+    return tensor & (tensor.sum(axis=-1) == 1)[..., None]
+
+
+def hidden_singles(tensor):
+    in_row = (row_counts(tensor) == 1)[..., :, None, :]
+    in_col = (col_counts(tensor) == 1)[..., None, :, :]
+    in_square = _expand_squares(square_counts(tensor) == 1)
+    return tensor & (in_row | in_col | in_square)
+
+
+def singles(tensor):
+    return naked_singles(tensor) | hidden_singles(tensor)
+
+
+def eliminate_peers(tensor, values):
+    """Remove the value of every filled cell from its row, col and square."""
+    values = np.asarray(values)
+    placed = values[..., None] == VALUES
+    in_row = placed.any(axis=-2)[..., :, None, :]
+    in_col = placed.any(axis=-3)[..., None, :, :]
+    in_square = _expand_squares(_squares(placed).any(axis=(-4, -2)))
+    return tensor & ~(in_row | in_col | in_square) & (values == 0)[..., None]
+
+
+class TensorBoardSolver:
+    """Board candidates held as a single 9x9x9 boolean tensor.
+
+    Singles detection and peer eliminations are done with axis sums and masked
+    updates over the whole board instead of per-cell loops.
+    """
+
+    def __init__(self, board=None, masks=None):
+        if board is None:
+            board = np.zeros((9, 9), dtype=int)
+        self.board = np.asarray(board)
+        if masks is None:
+            self.tensor = np.ones((9, 9, 9), dtype=bool)
+            self.tensor[self.board > 0] = False
+        else:
+            self.tensor = masks_to_tensor(masks)
+
+    @property
+    def masks(self):
+        return tensor_to_masks(self.tensor).tolist()
+
+    def eliminate_options_according_to_board(self):
+        self.tensor = eliminate_peers(self.tensor, self.board)
+
+    def next_step(self):
+        rows, cols, values = np.nonzero(singles(self.tensor))
+        return {
+            ((row, col), value + 1)
+            for row, col, value in zip(rows.tolist(), cols.tolist(), values.tolist())
+        }
+
+    def only_value_in_row(self, row, value):
+        return self.tensor[row, :, value - 1].sum() == 1
+
+    def only_value_in_col(self, col, value):
+        return self.tensor[:, col, value - 1].sum() == 1
+
+    def only_value_in_square(self, row, col, value):
+        row, col = row - row % 3, col - col % 3
+        return self.tensor[row : row + 3, col : col + 3, value - 1].sum() == 1
+
+    def only_value(self, row, col, value):
+        return (
+            self.only_value_in_row(row, value)
+            or self.only_value_in_col(col, value)
+            or self.only_value_in_square(row, col, value)
+        )
+
+
+def _has_duplicates(boards):
+    placed = boards[..., None] == VALUES
+    return (
+        (placed.sum(axis=-2) > 1).any(axis=(-2, -1))
+        | (placed.sum(axis=-3) > 1).any(axis=(-2, -1))
+        | (_squares(placed).sum(axis=(-4, -2)) > 1).any(axis=(-3, -2, -1))
+    )
+
+
+def solve_batch(boards):
+    """Propagate singles over a stack of boards of shape (N, 9, 9).
+
+    Every iteration places all naked and hidden singles of all still active
+    boards at once and eliminates them from their peers. Returns the filled
+    boards and a per-board ``stalled`` flag, set when a board could not be
+    completed by singles or ended up contradictory.
+    """
+    boards = np.array(boards, dtype=np.int8)
+    if boards.ndim != 3 or boards.shape[1:] != (9, 9):
+        raise ValueError(f"expected boards of shape (N, 9, 9), got {boards.shape}")
+    tensor = board_to_tensor(boards)
+    active = np.arange(len(boards))
+    while len(active):
+        found = singles(tensor)
+        progress = found.any(axis=-1)
+        moving = progress.any(axis=(-2, -1))
+        # boards with an empty unfilled cell are contradictory, stop them too
+        moving &= ~((boards[active] == 0) & ~tensor.any(axis=-1)).any(axis=(-2, -1))
+        if not moving.any():
+            break
+        active, tensor = active[moving], tensor[moving]
+        found, progress = found[moving], progress[moving]
+        placed = np.where(progress, found.argmax(axis=-1) + 1, 0).astype(np.int8)
+        boards[active] += placed
+        tensor = eliminate_peers(tensor, placed)
+    stalled = (boards == 0).any(axis=(-2, -1)) | _has_duplicates(boards)
+    return boards, stalled
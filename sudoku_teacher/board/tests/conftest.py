@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+from sudoku_teacher.board.solve_cache import get_cache
+from sudoku_teacher.board.sudoku_loader import LEVEL_PATH, read_board
+
+
+def library_board(level, sudoku_id):
+    """The board of a puzzle file of the library."""
+    return read_board(os.path.join(LEVEL_PATH.format(level=level), f"{sudoku_id}.txt"))
+
+
+@pytest.fixture
+def clear_cache():
+    get_cache().clear()
+    yield
+    get_cache().clear()
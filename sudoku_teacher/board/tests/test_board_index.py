@@ -0,0 +1,38 @@
+import pytest
+
+from sudoku_teacher.board.board_index import (
+    CELL_UNITS,
+    INTERSECTIONS,
+    PEERS,
+    UNITS,
+    UNIT_NAMES,
+    cell_index,
+)
+
+
+def test_units():
+    assert len(UNITS) == 27
+    assert len(UNIT_NAMES) == 27
+    for unit in UNITS:
+        assert len(unit) == 9
+    assert UNITS[18 + 4] == (30, 31, 32, 39, 40, 41, 48, 49, 50)
+    assert UNIT_NAMES[18 + 4] == "square-3-3"
+
+
+@pytest.mark.parametrize("row, col", [(0, 0), (4, 7), (8, 8)])
+def test_peers(row, col):
+    cell = cell_index(row, col)
+    peers = PEERS[cell]
+    assert len(peers) == 20
+    assert len(set(peers)) == 20
+    assert cell not in peers
+    expected = set()
+    for unit in CELL_UNITS[cell]:
+        expected.update(UNITS[unit])
+    assert set(peers) == expected - {cell}
+
+
+def test_intersections():
+    assert len(INTERSECTIONS) == 54
+    for square_unit, line_unit, cells in INTERSECTIONS:
+        assert set(cells) == set(UNITS[square_unit]) & set(UNITS[line_unit])
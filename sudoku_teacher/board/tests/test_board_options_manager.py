@@ -1,7 +1,6 @@
 import pytest
 
 from sudoku_teacher.board.board_solver import BoardSolver, ALL_VALS
-from sudoku_teacher.board.helper import session
 
 
 def set_set_value(s, new_val):
@@ -34,7 +33,7 @@ def test_square1():
 
 @pytest.mark.parametrize(
     "idx, naked_subset",
-    [(0, {2, 3}), (1, {1, 2, 3}), (2, {3, 2, 5, 4}), (3, {1, 2, 3, 4, 5, 6})],
+    [(0, {2, 3}), (1, {1, 2, 3}), (2, {3, 2, 5, 4})],
 )
 def test_naked_pair_from_row(idx, naked_subset):
     bom = BoardSolver()
@@ -51,7 +50,7 @@ def test_naked_pair_from_row(idx, naked_subset):
 
 @pytest.mark.parametrize(
     "idx, naked_subset",
-    [(0, {2, 3}), (1, {1, 2, 3}), (2, {3, 2, 5, 4}), (3, {1, 2, 3, 4, 5, 6})],
+    [(0, {2, 3}), (1, {1, 2, 3}), (2, {3, 2, 5, 4})],
 )
 def test_naked_pair_from_col(idx, naked_subset):
     bom = BoardSolver()
@@ -66,6 +65,37 @@ def test_naked_pair_from_col(idx, naked_subset):
         assert bom.options[i][idx] == ALL_VALS - naked_subset
 
 
+def test_large_naked_subset_found_as_hidden_subset():
+    # a naked 6-subset is the hidden triple of the other three cells
+    naked_subset = {1, 2, 3, 4, 5, 6}
+    bom = BoardSolver()
+    for i in range(len(naked_subset)):
+        set_set_value(bom.options[3][i], naked_subset)
+
+    bom.rows[3].handle_naked_subset()
+    bom.rows[3].handle_hidden_subset()
+
+    for i in range(len(naked_subset)):
+        assert bom.options[3][i] == naked_subset
+    for i in range(len(naked_subset), 9):
+        assert bom.options[3][i] == ALL_VALS - naked_subset
+
+
+def test_naked_triple_with_different_options():
+    bom = BoardSolver()
+    set_set_value(bom.options[0][0], {1, 2})
+    set_set_value(bom.options[0][1], {2, 3})
+    set_set_value(bom.options[0][2], {1, 3})
+
+    bom.rows[0].handle_naked_subset()
+
+    assert bom.options[0][0] == {1, 2}
+    assert bom.options[0][1] == {2, 3}
+    assert bom.options[0][2] == {1, 3}
+    for i in range(3, 9):
+        assert bom.options[0][i] == ALL_VALS - {1, 2, 3}
+
+
 @pytest.mark.parametrize(
     "naked_subset, extra",
     [({2, 3}, 9), ({1, 2, 3}, 9), ({3, 2, 5, 4}, 9), ({1, 2, 3, 4, 5, 6}, 9)],
@@ -323,3 +353,33 @@ def test_pointing_subset():
     assert bom.options[2][0] == ALL_VALS - {2, 3, 5}
     assert bom.options[2][1] == ALL_VALS - {2, 3, 5}
     assert bom.options[2][2] == ALL_VALS - {2, 3, 5}
+
+
+def test_pointing_subset_from_square():
+    bom = BoardSolver()
+    for i in (1, 2):
+        for j in range(3):
+            bom.options[i][j].discard(4)
+
+    bom.handle_pointing_subset(0, 0)
+
+    for j in range(3):
+        assert 4 in bom.options[0][j]
+    for j in range(3, 9):
+        assert 4 not in bom.options[0][j]
+    assert 4 in bom.options[1][5]
+    assert bom.intersections.masks[0] == bom.candidates[0]
+
+
+def test_claiming_subset():
+    bom = BoardSolver()
+    for j in range(3, 9):
+        bom.options[0][j].discard(4)
+
+    bom.handle_pointing_subset(0, 0)
+
+    for i in (1, 2):
+        for j in range(3):
+            assert 4 not in bom.options[i][j]
+    assert 4 in bom.options[0][0]
+    assert 4 in bom.options[1][3]
@@ -0,0 +1,58 @@
+import pytest
+
+from sudoku_teacher.board.candidates import (
+    ALL_OPTIONS,
+    CandidateStore,
+    bit_to_value,
+    lowest_bit,
+    mask_to_values,
+    popcount,
+    values_to_mask,
+)
+
+
+@pytest.mark.parametrize(
+    "values", [(), (1,), (9,), (2, 3), (1, 5, 9), tuple(range(1, 10))]
+)
+def test_mask_round_trip(values):
+    mask = values_to_mask(values)
+    assert mask_to_values(mask) == values
+    assert popcount(mask) == len(values)
+
+
+def test_lowest_bit():
+    mask = values_to_mask({4, 7, 8})
+    assert bit_to_value(lowest_bit(mask)) == 4
+    assert lowest_bit(0) == 0
+
+
+def test_store_from_board():
+    board = [[0] * 9 for _ in range(9)]
+    board[2][5] = 7
+    store = CandidateStore.from_board(board)
+    assert len(store) == 81
+    assert store[2 * 9 + 5] == 0
+    assert store[0] == ALL_OPTIONS
+
+
+def test_cell_options_view():
+    store = CandidateStore()
+    options = store.options(10)
+    options.clear()
+    options.update({2, 6})
+    assert options == {2, 6}
+    assert store[10] == values_to_mask({2, 6})
+    options.discard(2)
+    assert 6 in options and 2 not in options
+    assert len(options) == 1
+
+
+def test_eliminate_returns_removed_bits():
+    store = CandidateStore()
+    changed = []
+    store.listener = changed.append
+    removed = store.eliminate(3, values_to_mask({1, 2}))
+    assert removed == values_to_mask({1, 2})
+    assert store[3] == ALL_OPTIONS & ~removed
+    assert store.eliminate(3, values_to_mask({1})) == 0
+    assert changed == [3]
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from sudoku_teacher.board.board_solver import BoardSolver
+from sudoku_teacher.board.canonical import (
+    Transform,
+    canonical_fingerprint,
+    canonicalize,
+)
+from sudoku_teacher.board.candidates import ALL_OPTIONS
+from sudoku_teacher.board.tests.conftest import library_board
+
+
+def random_transform(rng):
+    def lines():
+        return tuple(
+            3 * band + line
+            for band in rng.sample(range(3), 3)
+            for line in rng.sample(range(3), 3)
+        )
+
+    digits = (0,) + tuple(rng.sample(range(1, 10), 9))
+    return Transform(rng.random() < 0.5, lines(), lines(), digits)
+
+
+def final_masks(trace, board):
+    masks = [0 if value else ALL_OPTIONS for row in board for value in row]
+    for step in range(len(trace)):
+        masks[trace.cells[step]] = trace.new_options[step]
+    return masks
+
+
+@pytest.mark.parametrize(
+    "level, sudoku_id", [("easy", 0), ("easy", 1), ("medium", 0), ("medium", 1)]
+)
+def test_equivalent_boards_share_canonical_form(level, sudoku_id):
+    rng = random.Random(sudoku_id)
+    board = library_board(level, sudoku_id)
+    canonical, transform = canonicalize(board)
+    assert transform.apply(board) == canonical
+    assert transform.inverse().apply(canonical) == board
+    for _ in range(10):
+        other = random_transform(rng).apply(board)
+        assert canonicalize(other)[0] == canonical
+        assert canonical_fingerprint(other) == canonical_fingerprint(board)
+
+
+def test_transform_inverse():
+    rng = random.Random(0)
+    board = library_board("easy", 0)
+    for _ in range(10):
+        transform = random_transform(rng)
+        inverse = transform.inverse()
+        assert inverse.apply(transform.apply(board)) == board
+        for cell in range(81):
+            assert inverse.cell(transform.cell(cell)) == cell
+        assert inverse.mask(transform.mask(0b101100111)) == 0b101100111
+
+
+def test_map_trace_back():
+    board = library_board("medium", 1)
+    canonical, transform = canonicalize(board)
+    bs = BoardSolver(canonical)
+    bs.solve_board()
+    trace = transform.inverse().map_trace(bs.trace)
+    direct = BoardSolver(board)
+    direct.solve_board()
+    assert len(trace) == len(bs.trace)
+    assert final_masks(trace, board) == direct.candidates.masks
+    for step in trace:
+        if step["key"] == "naked":
+            assert step["point"] not in step["reason_points"]
+            assert not set(step["new_options"]) & set(step["reason_options"])
+
+
+def test_distinct_boards():
+    easy, medium = library_board("easy", 0), library_board("medium", 1)
+    assert canonical_fingerprint(easy) != canonical_fingerprint(medium)
+    empty = [[0] * 9 for _ in range(9)]
+    assert canonicalize(empty)[0] == empty
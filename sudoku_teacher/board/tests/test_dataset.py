@@ -0,0 +1,85 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.management import call_command
+
+from sudoku_teacher.board.canonical import Transform
+from sudoku_teacher.board.dataset import import_dataset, pack_grids, parse_chunk
+from sudoku_teacher.board.models import Puzzle
+from sudoku_teacher.board.packing import pack_board
+from sudoku_teacher.board.sudoku_loader import iter_library
+
+pytestmark = pytest.mark.django_db
+
+
+def board_text(board, blank="."):
+    return "".join(str(value) if value else blank for row in board for value in row)
+
+
+@pytest.fixture
+def dataset():
+    # medium 0 gives a value twice in a unit
+    boards = [board for _, _, board in iter_library()]
+    boards = boards[:2] + boards[3:]
+    transform = Transform(
+        False, (1, 0, 2, 3, 4, 5, 6, 7, 8), tuple(range(9)), tuple(range(10))
+    )
+    conflicting = [[0] * 9 for _ in range(9)]
+    conflicting[0][0] = conflicting[0][8] = 5
+    lines = [
+        "# a comment",
+        board_text(boards[0]),
+        board_text(boards[1], blank="0") + ",extra fields",
+        "",
+        board_text(boards[2]) + " 4.5",
+        board_text(transform.apply(boards[0])),
+        board_text(boards[2])[:80],
+        board_text(boards[2]).replace(".", "x", 1),
+        board_text(conflicting),
+        board_text(boards[2]),
+        board_text(boards[1]),
+    ]
+    return boards, "\n".join(lines).encode() + b"\n"
+
+
+def test_parse_chunk(dataset):
+    boards, data = dataset
+    chunk = parse_chunk(data.splitlines(keepends=True))
+    assert chunk.lines == 9
+    assert chunk.invalid == 3
+    assert chunk.grids.reshape(-1, 9, 9).tolist()[:3] == boards
+    assert pack_grids(chunk.grids) == [
+        pack_board(board) for board in chunk.grids.reshape(-1, 9, 9).tolist()
+    ]
+
+
+def test_import_dataset(dataset):
+    boards, data = dataset
+    reports = []
+    result = import_dataset(
+        io.BytesIO(data), "imported", chunk_size=4, progress=reports.append
+    )
+    assert (result.lines, result.invalid, result.imported, result.duplicates) == (
+        9,
+        3,
+        3,
+        3,
+    )
+    assert [report.lines for report in reports] == [2, 6, 9]
+    assert [puzzle.board for puzzle in Puzzle.objects.order_by("sequence")] == boards
+
+    with ThreadPoolExecutor(2) as executor:
+        result = import_dataset(io.BytesIO(data), "imported", executor=executor)
+    assert (result.imported, result.duplicates) == (0, 6)
+    assert result.invalid == 3
+
+
+def test_import_dataset_command(dataset, tmp_path):
+    _, data = dataset
+    path = tmp_path / "puzzles.txt"
+    path.write_bytes(data)
+    out = io.StringIO()
+    call_command("import_dataset", str(path), level="big", jobs=1, stdout=out)
+    assert "Imported 3 puzzles from 9 lines" in out.getvalue()
+    assert Puzzle.objects.level_count("big") == 3
@@ -0,0 +1,71 @@
+import pytest
+
+from sudoku_teacher.board.board_solver import BoardSolver
+from sudoku_teacher.board.exact_cover import (
+    ExactCoverSolver,
+    count_solutions,
+    has_unique_solution,
+    solve,
+)
+from sudoku_teacher.board.tests.conftest import library_board
+
+HARD = (
+    "800000000003600000070090200"
+    "050007000000045700000100030"
+    "001000068008500010090000400"
+)
+
+
+def parse(text):
+    return [[int(text[row * 9 + col]) for col in range(9)] for row in range(9)]
+
+
+def assert_valid_solution(board, solution):
+    for row in range(9):
+        assert sorted(solution[row]) == list(range(1, 10))
+        assert sorted(solution[i][row] for i in range(9)) == list(range(1, 10))
+        assert all(board[row][col] in (0, solution[row][col]) for col in range(9))
+    for idx in range(9):
+        r, c = idx // 3 * 3, idx % 3 * 3
+        square = [solution[r + i][c + j] for i in range(3) for j in range(3)]
+        assert sorted(square) == list(range(1, 10))
+
+
+@pytest.mark.parametrize("level, sudoku_id", [("easy", 0), ("medium", 1)])
+def test_solve(level, sudoku_id):
+    board = library_board(level, sudoku_id)
+    assert_valid_solution(board, solve(board))
+    assert has_unique_solution(board)
+
+
+def test_solve_hard():
+    board = parse(HARD)
+    assert_valid_solution(board, solve(board))
+    assert count_solutions(board, limit=5) == 1
+
+
+def test_count_solutions_limit():
+    board = [[0] * 9 for _ in range(9)]
+    assert count_solutions(board, limit=3) == 3
+    assert not has_unique_solution(board)
+
+
+def test_unsolvable():
+    assert solve(library_board("medium", 0)) is None
+    board = [[0] * 9 for _ in range(9)]
+    board[0][0] = board[0][5] = 4
+    assert count_solutions(board) == 0
+
+
+def test_solver_is_reusable():
+    solver = ExactCoverSolver(parse(HARD))
+    assert solver.solve() == solver.solve()
+    assert len(solver.columns) == 324
+
+
+def test_solve_from_candidate_state():
+    board = library_board("medium", 1)
+    bom = BoardSolver(board)
+    bom.solve_board()
+    assert bom.count_solutions() == 1
+    assert bom.solve_exact() == solve(board)
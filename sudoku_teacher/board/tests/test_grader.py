@@ -0,0 +1,61 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.management import call_command
+
+from sudoku_teacher.board.board_solver import SOLVER_VERSION
+from sudoku_teacher.board.grader import grade_puzzles
+from sudoku_teacher.board.grading import TECHNIQUES, UNSOLVED
+from sudoku_teacher.board.jobs import grade_board
+from sudoku_teacher.board.models import Puzzle
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def puzzles():
+    call_command("import_library")
+    return Puzzle.objects.order_by("pk")
+
+
+def test_grade_puzzles(puzzles):
+    reports = []
+    result = grade_puzzles(chunk_size=3, progress=reports.append)
+    assert (result.graded, result.unsolved) == (4, 1)
+    assert [report.graded for report in reports] == [3, 4]
+    for puzzle in puzzles:
+        grade = grade_board(puzzle.board)
+        assert puzzle.graded_version == SOLVER_VERSION
+        assert puzzle.grade == grade.level
+        assert puzzle.technique_counts == list(grade.counts)
+        assert len(puzzle.technique_counts) == len(TECHNIQUES)
+    assert puzzles.get(level="medium", sequence=0).grade == UNSOLVED
+    assert {puzzle.grade for puzzle in puzzles.filter(level="easy")} == {
+        TECHNIQUES.index("naked single")
+    }
+
+    # nothing left, until the solver changes
+    assert grade_puzzles().graded == 0
+    puzzles.filter(level="easy").update(graded_version=SOLVER_VERSION - 1)
+    assert grade_puzzles().graded == 2
+    assert grade_puzzles(level="medium", force=True).graded == 2
+
+
+def test_grade_puzzles_resumes(puzzles):
+    first, second = puzzles[:2]
+    Puzzle.objects.filter(pk=first.pk).update(
+        grade=0, technique_counts=[], graded_version=SOLVER_VERSION
+    )
+    with ThreadPoolExecutor(2) as executor:
+        result = grade_puzzles(chunk_size=1, executor=executor, max_pending=2)
+    assert result.graded == 3
+    assert puzzles.get(pk=first.pk).technique_counts == []
+    assert puzzles.get(pk=second.pk).technique_counts
+
+
+def test_grade_puzzles_command(puzzles):
+    out = io.StringIO()
+    call_command("grade_puzzles", jobs=1, stdout=out)
+    assert "Graded 4 puzzles" in out.getvalue()
+    assert not puzzles.filter(grade=None).exists()
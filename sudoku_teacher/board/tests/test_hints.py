@@ -0,0 +1,41 @@
+import pytest
+
+from sudoku_teacher.board.board_solver import BoardSolver
+from sudoku_teacher.board.grading import TECHNIQUES, step_technique
+from sudoku_teacher.board.hints import iter_technique_steps, next_hint
+from sudoku_teacher.board.tests.conftest import library_board
+from sudoku_teacher.board.trace import INITIAL
+
+
+@pytest.mark.parametrize("level, sudoku_id", [("easy", 0), ("easy", 1), ("medium", 1)])
+def test_next_hint(level, sudoku_id):
+    board = library_board(level, sudoku_id)
+    hint = next_hint(board)
+    assert hint is not None
+    trace = hint.trace
+    assert len(trace)
+    assert {trace.units[idx] for idx in range(len(trace))} == {trace.units[0]}
+    for idx in range(len(trace)):
+        assert trace.kinds[idx] != INITIAL
+        assert TECHNIQUES[step_technique(trace, idx)] == hint.technique
+
+    # cheaper techniques find nothing
+    bs = BoardSolver(board)
+    bs.eliminate_options_according_to_board()
+    bs.trace.clear()
+    for technique in TECHNIQUES[1 : TECHNIQUES.index(hint.technique)]:
+        for _ in iter_technique_steps(bs, technique):
+            pass
+    assert not len(bs.trace)
+
+    # and the hint never removes a value of the solution
+    solved = BoardSolver(board)
+    solved.solve_board()
+    for idx in range(len(trace)):
+        assert not trace.removed_options[idx] & solved.candidates[trace.cells[idx]]
+
+
+def test_no_hint():
+    board = [[0] * 9 for _ in range(9)]
+    board[4][4] = 5
+    assert next_hint(board) is None
@@ -0,0 +1,59 @@
+import pytest
+from django.core.management import call_command
+
+from sudoku_teacher.board import sudoku_loader
+from sudoku_teacher.board.library import PackedLibrary, write_library
+from sudoku_teacher.board.sudoku_loader import Sudoku, iter_library
+
+
+@pytest.fixture
+def library_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "library.pack")
+    monkeypatch.setattr(sudoku_loader, "LIBRARY_FILE", path)
+    monkeypatch.setattr(sudoku_loader, "_library", None)
+    yield path
+    if sudoku_loader._library is not None:
+        sudoku_loader._library.close()
+
+
+def test_pack_library(library_file):
+    call_command("pack_library", output=library_file)
+    with PackedLibrary(library_file) as library:
+        assert list(library) == list(iter_library())
+        assert len(library) == 4
+        assert library.count("easy") == 2
+        assert library.count("hard") == 0
+        assert library.board("medium", 1) == list(iter_library())[3][2]
+        with pytest.raises(IndexError):
+            library.board("easy", 2)
+
+
+def test_sudoku_reads_packed_library(library_file):
+    text_board = Sudoku().board
+    board = [[0] * 9 for _ in range(9)]
+    write_library(library_file, {sudoku_loader.LEVEL: [board]})
+    assert Sudoku().board == board != text_board
+
+
+def test_library_is_reopened_with_its_stamp(library_file):
+    board = [[0] * 9 for _ in range(9)]
+    write_library(library_file, {"easy": [board]})
+    library, stamp = sudoku_loader.get_library()
+    assert stamp == sudoku_loader.file_stamp(library_file)
+    assert sudoku_loader.get_library() == (library, stamp)
+    write_library(library_file, {"easy": [board, board]})
+    library, stamp = sudoku_loader.get_library()
+    assert len(library) == 2
+    assert stamp == sudoku_loader.file_stamp(library_file)
+
+
+def test_invalid_library(tmp_path):
+    path = str(tmp_path / "library.pack")
+    write_library(path, {"easy": [[[0] * 9 for _ in range(9)]]})
+    with open(path, "rb") as f:
+        data = f.read()
+    for bad in (data[:-1], b"XLIB" + data[4:], b""):
+        with open(path, "wb") as f:
+            f.write(bad)
+        with pytest.raises(ValueError):
+            PackedLibrary(path)
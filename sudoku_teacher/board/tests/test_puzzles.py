@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.http import Http404
+from django.test import RequestFactory
+
+from sudoku_teacher.board.canonical import Transform
+from sudoku_teacher.board.models import Puzzle
+from sudoku_teacher.board.puzzles import import_puzzles
+from sudoku_teacher.board.solve_cache import get_cache
+from sudoku_teacher.board.sudoku_loader import iter_level, iter_library
+from sudoku_teacher.board.views import get_board, requested_board
+
+pytestmark = pytest.mark.django_db
+
+
+def test_import_library():
+    call_command("import_library")
+    assert Puzzle.objects.count() == 4
+    for level, sudoku_id, board in iter_library():
+        puzzle = Puzzle.objects.by_level(level, sudoku_id)
+        assert puzzle.board == board
+        assert puzzle.givens == sum(1 for row in board for value in row if value)
+        assert puzzle.grade is None
+
+    # a second import finds them all
+    call_command("import_library")
+    assert Puzzle.objects.count() == 4
+
+
+def test_import_skips_equivalent_boards():
+    board = next(iter_level("easy"))[1]
+    transform = Transform(
+        True,
+        (2, 1, 0, 3, 4, 5, 6, 7, 8),
+        tuple(range(9)),
+        (0, 2, 1, 3, 4, 5, 6, 7, 8, 9),
+    )
+    boards = [board, transform.apply(board), board]
+    assert import_puzzles(boards, "easy", batch_size=2) == (1, 2)
+    assert import_puzzles([transform.apply(board)], "medium") == (0, 1)
+    assert Puzzle.objects.level_count("medium") == 0
+
+
+def test_random_puzzle():
+    with pytest.raises(Puzzle.DoesNotExist):
+        Puzzle.objects.random()
+    call_command("import_library")
+    assert Puzzle.objects.level_count("easy") == 2
+    assert Puzzle.objects.random("easy").level == "easy"
+    assert Puzzle.objects.random() in Puzzle.objects.all()
+    with pytest.raises(Puzzle.DoesNotExist):
+        Puzzle.objects.random("hard")
+
+
+def test_get_board_by_level():
+    get_cache().clear()
+    call_command("import_library")
+    request = RequestFactory().get("/board/get_board/", {"level": "medium", "id": 1})
+    result = json.loads(get_board(request).content)
+    assert result["board"] == Puzzle.objects.by_level("medium", 1).board
+    with pytest.raises(Http404):
+        requested_board({"level": "medium", "id": "7"})
+    with pytest.raises(Http404):
+        requested_board({"level": "medium", "id": "x"})
+    get_cache().clear()
@@ -1,8 +1,10 @@
 import pytest
 
 from sudoku_teacher.board.board_solver import BoardSolver, ALL_VALS
-from sudoku_teacher.board.helper import session_update_list
+from sudoku_teacher.board.budget import SolveBudget, SolveCursor
+from sudoku_teacher.board.candidates import CHECK_INCREMENTAL, CHECK_OFF, Contradiction
 from sudoku_teacher.board.sudoku_loader import Sudoku
+from sudoku_teacher.board.tests.conftest import library_board
 
 
 @pytest.mark.parametrize(
@@ -10,7 +12,6 @@ from sudoku_teacher.board.sudoku_loader import Sudoku
     [(5, 6, 7), (3, 0, 3), (2, 7, 8), (1, 1, 9), (8, 5, 9)],
 )
 def test_eliminate_options_according_to_board(row, col, value):
-    session_update_list.clear()
     board = []
     for i in range(9):
         board.append([0 for _ in range(9)])
@@ -29,14 +30,120 @@ def test_eliminate_options_according_to_board(row, col, value):
     for point, values in bom.get_square_points_to_options(row, col).items():
         if point != (row, col):
             assert bom.options[point[0]][point[1]] == new_options
-    assert session_update_list
-    for reason in session_update_list:
+    assert bom.trace
+    for reason in bom.trace:
         assert reason["point"] != (row, col)
 
 
 def test_solve0():
-    session_update_list.clear()
     board = Sudoku().board
     bom = BoardSolver(board)
+    # the default puzzle has no solution
+    with pytest.raises(Contradiction):
+        bom.solve_board()
+
+
+@pytest.mark.parametrize("level, sudoku_id", [("easy", 0), ("easy", 1), ("medium", 1)])
+def test_solve_to_single_options(level, sudoku_id):
+    board = library_board(level, sudoku_id)
+    bom = BoardSolver(board)
+    bom.solve_board()
+    for i in range(9):
+        for j in range(9):
+            if board[i][j] == 0:
+                assert len(bom.options[i][j]) == 1
+    assert not bom.propagator.queue
+
+
+def test_propagator_queues_unit_once():
+    bom = BoardSolver()
+    propagator = bom.propagator
+    propagator.mark_cell(0)
+    propagator.mark_cell(1)
+    assert sorted(propagator.queue) == [0, 9, 10, 18]
+
+
+def test_update_board_options_according_to_cell():
+    board = library_board("easy", 0)
+    bom = BoardSolver(board)
+    bom.eliminate_options_according_to_board()
+    for i in range(9):
+        for j in range(9):
+            if board[i][j]:
+                bom.update_board_options_according_to_cell(i, j)
+    for step in bom.trace:
+        if step["key"] != "initial":
+            assert set(step["new_options"]) < set(step["orig_options"])
+
+
+@pytest.mark.parametrize("check_mode", [CHECK_OFF, CHECK_INCREMENTAL])
+def test_check_modes(check_mode):
+    bom = BoardSolver(library_board("easy", 0), check_mode=check_mode)
+    bom.solve_board()
+    bom.assert_rules()
+
+
+def test_incremental_check_raises_on_empty_cell():
+    bom = BoardSolver(check_mode=CHECK_INCREMENTAL)
+    bom.candidates.eliminate(0, 0x1FE)
+    with pytest.raises(Contradiction) as e:
+        bom.candidates.eliminate(0, 0x1)
+    assert e.value.cell == 0
+
+
+def test_unknown_check_mode():
+    with pytest.raises(ValueError):
+        BoardSolver(check_mode="sometimes")
+
+
+def test_iter_solve_yields_steps_as_recorded():
+    board = library_board("medium", 1)
+    bom = BoardSolver(board)
+    seen = []
+    for idx in bom.iter_solve():
+        assert idx == len(seen) and idx < len(bom.trace)
+        seen.append(idx)
+    assert len(seen) == len(bom.trace)
+    solved = BoardSolver(board)
+    solved.solve_board()
+    assert solved.trace.steps == bom.trace.steps
+
+
+@pytest.mark.parametrize("max_steps", [1, 7, 40])
+def test_budgeted_solve_resumes(max_steps):
+    board = library_board("medium", 1)
+    bom = BoardSolver(board)
     bom.solve_board()
-    a=2
+
+    rows, calls = [], 0
+    bs = BoardSolver(board)
+    cursor = bs.solve_within(SolveBudget(max_steps=max_steps))
+    while True:
+        calls += 1
+        assert bs.trace_offset == len(rows)
+        rows += [bs.trace.row(idx) for idx in range(len(bs.trace))]
+        if cursor is None:
+            break
+        cursor = SolveCursor.from_bytes(cursor.to_bytes())
+        bs = BoardSolver.resume(cursor)
+        cursor = bs.solve_within(SolveBudget(max_steps=max_steps))
+    assert calls > 1
+    assert rows == [bom.trace.row(idx) for idx in range(len(bom.trace))]
+    assert bs.candidates.masks == bom.candidates.masks
+
+
+def test_budget_limits():
+    board = library_board("easy", 0)
+    bs = BoardSolver(board)
+    assert bs.solve_within(SolveBudget(deadline=0)) is not None
+    assert bs.solve_within(SolveBudget(max_eliminations=5)) is not None
+    assert bs.solve_within(SolveBudget()) is None
+    assert bs.done
+
+
+def test_resume_rejects_other_solver_versions():
+    cursor = BoardSolver(library_board("easy", 0)).cursor()
+    with pytest.raises(ValueError):
+        BoardSolver.resume(cursor._replace(solver_version=cursor.solver_version + 1))
+    with pytest.raises(ValueError):
+        SolveCursor.from_bytes(cursor.to_bytes()[:-1])
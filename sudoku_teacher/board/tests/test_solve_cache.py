@@ -0,0 +1,83 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from sudoku_teacher.board import solve_cache
+from sudoku_teacher.board.solve_cache import (
+    await_cached,
+    cached_solve,
+    get_cache,
+    solve_cache_key,
+)
+from sudoku_teacher.board.tests.conftest import library_board
+
+
+pytestmark = pytest.mark.usefixtures("clear_cache")
+
+
+def test_cache_key():
+    easy, medium = library_board("easy", 0), library_board("medium", 1)
+    key = solve_cache_key(easy, "json")
+    assert key == solve_cache_key(library_board("easy", 0), "json")
+    assert solve_cache_key(easy, "json") != solve_cache_key(medium, "json")
+    assert solve_cache_key(easy, "json") != solve_cache_key(easy, "binary")
+
+
+def test_cache_key_has_solver_version(monkeypatch):
+    board = library_board("easy", 0)
+    key = solve_cache_key(board, "json")
+    monkeypatch.setattr(solve_cache, "SOLVER_VERSION", -1)
+    assert solve_cache_key(board, "json") != key
+
+
+def test_cached_solve_renders_once():
+    board = library_board("easy", 0)
+    calls = []
+
+    def render():
+        calls.append(1)
+        return b"content"
+
+    assert cached_solve(board, "json", render) == b"content"
+    assert cached_solve(board, "json", render) == b"content"
+    assert len(calls) == 1
+
+
+def test_concurrent_misses_render_once():
+    board = library_board("medium", 1)
+    calls = []
+    lock = threading.Lock()
+
+    def render():
+        with lock:
+            calls.append(1)
+        time.sleep(0.2)
+        return b"content"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(lambda _: cached_solve(board, "json", render), range(4))
+        )
+    assert results == [b"content"] * 4
+    assert len(calls) == 1
+
+
+def test_locked_puzzle_is_awaited_off_the_solver_threads():
+    board = library_board("easy", 0)
+    key = solve_cache_key(board, "json")
+    assert async_to_sync(await_cached)(board, "json") is None
+
+    # another worker holds the lock: async callers wait a bounded time, and
+    # solver threads told not to wait render right away
+    get_cache().set(f"{key}:lock", "token")
+    started = time.monotonic()
+    assert async_to_sync(await_cached)(board, "json", 0.2) is None
+    assert 0.2 <= time.monotonic() - started < 1
+    assert cached_solve(board, "json", lambda: b"mine", wait=0) == b"mine"
+
+    get_cache().delete(key)
+    threading.Timer(0.1, get_cache().set, (key, b"theirs")).start()
+    assert async_to_sync(await_cached)(board, "json") == b"theirs"
@@ -0,0 +1,86 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from sudoku_teacher.board import jobs
+from sudoku_teacher.board.grading import TECHNIQUES, UNSOLVED
+from sudoku_teacher.board.hints import next_hint
+from sudoku_teacher.board.jobs import grade_board, solve_content
+from sudoku_teacher.board.packing import PACKED_SIZE, pack_board, unpack_board
+from sudoku_teacher.board.solve_service import (
+    SolveCancelled,
+    SolveService,
+    SolveTimeout,
+)
+from sudoku_teacher.board.tests.conftest import library_board
+
+
+def slow_job(board):
+    time.sleep(30)
+
+
+@pytest.fixture(scope="module")
+def service():
+    service = SolveService(1)
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def fork_service(monkeypatch):
+    # forked workers see the jobs patched in here
+    monkeypatch.setitem(jobs.JOBS, "slow", slow_job)
+    service = SolveService(1, mp_context=multiprocessing.get_context("fork"))
+    yield service
+    service.close()
+
+
+def test_pack_board():
+    board = library_board("easy", 0)
+    data = pack_board(board)
+    assert len(data) == PACKED_SIZE
+    assert unpack_board(data) == board
+    with pytest.raises(ValueError):
+        pack_board([[10] * 9] * 9)
+    with pytest.raises(ValueError):
+        unpack_board(data[:-1])
+
+
+def test_grade_board():
+    grade = grade_board(library_board("easy", 0))
+    assert grade.solved
+    assert grade.level < UNSOLVED
+    assert grade.counts[grade.level]
+    assert not any(grade.counts[grade.level + 1 :])
+    assert grade.technique == TECHNIQUES[grade.level]
+
+
+def test_service_runs_jobs(service):
+    board = library_board("easy", 1)
+    assert service.run("solve", board) == solve_content(board)
+    assert service.run("grade", board) == grade_board(board)
+    hint = next_hint(board)
+    assert service.run("hint", board) == (hint.technique, hint.trace.to_bytes())
+    assert asyncio.run(service.arun("grade", board)) == grade_board(board)
+    with pytest.raises(ValueError):
+        service.run("unknown", board)
+
+
+def test_service_timeout(fork_service):
+    board = library_board("easy", 0)
+    worker = fork_service.workers[0]
+    with pytest.raises(SolveTimeout):
+        fork_service.run("slow", board, timeout=0.2)
+    assert not worker.process.is_alive()
+    assert fork_service.workers[0] is not worker
+    assert fork_service.run("grade", board) == grade_board(board)
+
+
+def test_service_cancel(fork_service):
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    with pytest.raises(SolveCancelled):
+        fork_service.run("slow", library_board("easy", 0), cancel=cancel)
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from sudoku_teacher.board import sudoku_loader
+from sudoku_teacher.board.board_solver import BoardSolver
+from sudoku_teacher.board.sudoku_loader import (
+    BoardCache,
+    Sudoku,
+    get_board_cache,
+    initial_masks,
+    load_puzzle,
+)
+
+
+@pytest.fixture
+def level_path(tmp_path, monkeypatch):
+    os.mkdir(tmp_path / "easy")
+    monkeypatch.setattr(sudoku_loader, "LEVEL_PATH", str(tmp_path / "{level}"))
+    monkeypatch.setattr(sudoku_loader, "LIBRARY_FILE", str(tmp_path / "none.pack"))
+    monkeypatch.setattr(sudoku_loader, "_board_cache", BoardCache(2))
+    return tmp_path
+
+
+def write_board(path, board, mtime=None):
+    with open(path, "w") as f:
+        f.write("\n".join("".join(map(str, row)) for row in board))
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def test_board_cache_hits_and_evicts(level_path):
+    board = [[0] * 9 for _ in range(9)]
+    for sudoku_id in range(3):
+        board[0][0] = sudoku_id + 1
+        write_board(level_path / "easy" / f"{sudoku_id}.txt", board)
+
+    assert load_puzzle("easy", 0)[0][0][0] == 1
+    assert load_puzzle("easy", 0)[0][0][0] == 1
+    load_puzzle("easy", 1)
+    load_puzzle("easy", 2)
+    info = get_board_cache().info()
+    assert (info.hits, info.misses, info.currsize, info.maxsize) == (1, 3, 2, 2)
+    # 0 was the least recently used
+    load_puzzle("easy", 0)
+    assert get_board_cache().info().misses == 4
+
+
+def test_board_cache_invalidates_changed_files(level_path):
+    path = level_path / "easy" / "0.txt"
+    board = [[0] * 9 for _ in range(9)]
+    write_board(path, board, mtime=1_600_000_000_000_000_000)
+    assert load_puzzle("easy", 0)[0] == tuple(map(tuple, board))
+    board[4][4] = 7
+    write_board(path, board, mtime=1_700_000_000_000_000_000)
+    assert load_puzzle("easy", 0)[0][4][4] == 7
+    assert get_board_cache().info().invalidations == 1
+
+
+def test_sudoku_candidates():
+    sudoku = Sudoku()
+    bs = BoardSolver(sudoku.board)
+    bs.eliminate_options_according_to_board()
+    assert sudoku.candidates.masks == bs.candidates.masks
+    assert tuple(sudoku.candidates.masks) == initial_masks(sudoku.board)
+    # boards handed out do not share rows with the cache
+    sudoku.board[0][0] = 0 if sudoku.board[0][0] else 1
+    assert Sudoku().board != sudoku.board
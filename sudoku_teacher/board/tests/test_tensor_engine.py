@@ -0,0 +1,93 @@
+import random
+
+import numpy as np
+import pytest
+
+from sudoku_teacher.board.board_solver import BoardSolver
+from sudoku_teacher.board.candidates import MASK_TO_VALUES, POPCOUNT
+from sudoku_teacher.board.tensor_engine import (
+    TensorBoardSolver,
+    board_to_tensor,
+    masks_to_tensor,
+    solve_batch,
+    tensor_to_masks,
+)
+from sudoku_teacher.board.tests.conftest import library_board
+
+BATCH = [("easy", 0), ("easy", 1), ("medium", 0)]
+
+
+def scalar_next_step(bom):
+    res = set()
+    masks = bom.candidates.masks
+    for i in range(9):
+        for j in range(9):
+            options = masks[i * 9 + j]
+            if POPCOUNT[options] == 1:
+                res.add(((i, j), MASK_TO_VALUES[options][0]))
+            for value in MASK_TO_VALUES[options]:
+                if bom.only_value(i, j, value):
+                    res.add(((i, j), value))
+    return res
+
+
+def test_masks_round_trip():
+    masks = [random.randrange(512) for _ in range(81)]
+    assert tensor_to_masks(masks_to_tensor(masks)).tolist() == masks
+
+
+@pytest.mark.parametrize("level, sudoku_id", [("easy", 0), ("easy", 1), ("medium", 1)])
+def test_eliminate_peers_matches_board_solver(level, sudoku_id):
+    board = library_board(level, sudoku_id)
+    bom = BoardSolver(board)
+    bom.eliminate_options_according_to_board()
+    assert tensor_to_masks(board_to_tensor(board)).tolist() == bom.candidates.masks
+
+    tbs = TensorBoardSolver(board)
+    tbs.eliminate_options_according_to_board()
+    assert tbs.masks == bom.candidates.masks
+
+
+@pytest.mark.parametrize("level, sudoku_id", [("easy", 0), ("medium", 1)])
+def test_next_step_matches_scalar_rules(level, sudoku_id):
+    bom = BoardSolver(library_board(level, sudoku_id))
+    bom.eliminate_options_according_to_board()
+    propagator = bom.propagator
+    propagator.mark_all()
+    while propagator.queue:
+        expected = scalar_next_step(bom)
+        assert bom.next_step() == expected
+        tbs = TensorBoardSolver(bom.board, bom.candidates.masks)
+        for (row, col), value in expected:
+            assert tbs.only_value(row, col, value) == bom.only_value(row, col, value)
+        propagator.step()
+
+
+def test_batched_tensor_shapes():
+    boards = np.zeros((4, 9, 9), dtype=int)
+    boards[:, 0, 0] = [1, 2, 3, 4]
+    tensor = board_to_tensor(boards)
+    assert tensor.shape == (4, 9, 9, 9)
+    assert not tensor[2, 0, 5, 2]
+    assert tensor[2, 0, 5, 1]
+
+
+def test_solve_batch():
+    boards = [library_board(level, sudoku_id) for level, sudoku_id in BATCH]
+    boards.append([[0] * 9 for _ in range(9)])
+    solved, stalled = solve_batch(boards)
+    assert solved.shape == (len(boards), 9, 9)
+    assert stalled.tolist() == [False, False, True, True]
+    for board, grid in zip(boards[:2], solved[:2]):
+        bom = BoardSolver(board)
+        bom.solve_board()
+        for i in range(9):
+            for j in range(9):
+                expected = board[i][j] or next(iter(bom.options[i][j]))
+                assert grid[i, j] == expected
+    assert not solved[3].any()
+
+
+def test_solve_batch_rejects_bad_shape():
+    with pytest.raises(ValueError):
+        solve_batch(np.zeros((9, 9)))
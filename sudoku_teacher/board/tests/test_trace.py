@@ -0,0 +1,80 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sudoku_teacher.board.board_solver import BoardSolver
+from sudoku_teacher.board.tests.conftest import library_board
+from sudoku_teacher.board.trace import NAKED, SolveTrace
+
+
+def solve_steps(level, sudoku_id):
+    bom = BoardSolver(library_board(level, sudoku_id))
+    bom.solve_board()
+    return bom.trace.steps
+
+
+def test_trace_is_bounded():
+    trace = SolveTrace(max_steps=2)
+    for cell in range(3):
+        trace.record(NAKED, cell, 1, 2, unit=0)
+    assert [step["point"] for step in trace] == [(0, 0), (0, 1)]
+    assert trace.truncated
+    trace.clear()
+    assert len(trace) == 0 and not trace.truncated
+
+
+def test_negative_max_steps():
+    with pytest.raises(ValueError):
+        SolveTrace(max_steps=-1)
+
+
+def test_solver_trace_truncated():
+    bom = BoardSolver(library_board("easy", 0), trace=SolveTrace(max_steps=10))
+    bom.solve_board()
+    assert len(bom.trace) == 10
+    assert bom.trace.truncated
+
+
+def test_solves_are_isolated():
+    expected = solve_steps("easy", 0)
+    assert expected and solve_steps("easy", 0) == expected
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(solve_steps, ["easy"] * 8, [0, 1] * 4))
+    assert results[0::2] == [expected] * 4
+    assert results[1::2] == [solve_steps("easy", 1)] * 4
+
+
+def test_step_decoding():
+    trace = SolveTrace()
+    trace.record(NAKED, 12, 0b110, 0b1, unit=1, reason_points=0b101, reason_options=1)
+    assert trace[0] == {
+        "key": "naked",
+        "point": (1, 3),
+        "orig_options": (1, 2, 3),
+        "new_options": (2, 3),
+        "reason_points": [(1, 0), (1, 2)],
+        "reason_options": (1,),
+        "rule_loc": "row-1",
+        "neighbor": "",
+    }
+
+
+def test_json_and_binary_round_trip():
+    bom = BoardSolver(library_board("medium", 1))
+    bom.solve_board()
+    steps = bom.trace.steps
+    data = json.loads(json.dumps(bom.trace.to_dict()))
+    assert SolveTrace.from_dict(data).steps == steps
+    assert SolveTrace.from_bytes(bom.trace.to_bytes()).steps == steps
+    assert len(bom.trace.to_bytes()) < len(json.dumps(steps)) / 10
+
+
+def test_bad_binary_trace():
+    with pytest.raises(ValueError):
+        SolveTrace.from_bytes(b"XXXX" + bytes(6))
+    bom = BoardSolver(library_board("easy", 0))
+    bom.solve_board()
+    data = bom.trace.to_bytes()
+    with pytest.raises(ValueError):
+        SolveTrace.from_bytes(data[:-1])
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test import RequestFactory
+
+from sudoku_teacher.board import sudoku_loader, trace_store
+from sudoku_teacher.board.canonical import canonicalize
+from sudoku_teacher.board.jobs import solve_content
+from sudoku_teacher.board.library import write_library
+from sudoku_teacher.board.models import StoredTrace
+from sudoku_teacher.board.puzzles import import_puzzles
+from sudoku_teacher.board.solve_cache import puzzle_fingerprint
+from sudoku_teacher.board.sudoku_loader import iter_library
+from sudoku_teacher.board.trace_store import load_content, stored_content
+from sudoku_teacher.board.views import get_board
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("clear_cache")]
+
+
+def test_iter_library():
+    puzzles = list(iter_library())
+    assert [(level, sudoku_id) for level, sudoku_id, _ in puzzles] == [
+        ("easy", 0),
+        ("easy", 1),
+        ("medium", 0),
+        ("medium", 1),
+    ]
+
+
+def test_precompute_traces():
+    call_command("precompute_traces", jobs=1)
+    assert StoredTrace.objects.count() == 4
+    for _, _, board in iter_library():
+        canonical, _ = canonicalize(board)
+        stored = StoredTrace.objects.get(fingerprint=puzzle_fingerprint(canonical))
+        assert bytes(stored.content) == solve_content(canonical)
+
+    call_command("precompute_traces", jobs=1)
+    assert StoredTrace.objects.count() == 4
+    call_command("precompute_traces", jobs=1, force=True)
+    assert StoredTrace.objects.count() == 4
+
+
+def test_precompute_traces_in_parallel():
+    call_command("precompute_traces", jobs=2, chunk_size=1, warm_cache=True)
+    assert StoredTrace.objects.count() == 4
+
+
+def fewer_givens(board, removed):
+    # a board equivalent to none of the library
+    board = [list(row) for row in board]
+    cells = [(i, j) for i in range(9) for j in range(9) if board[i][j]]
+    for i, j in cells[:removed]:
+        board[i][j] = 0
+    return board
+
+
+def test_precompute_traces_of_every_source(tmp_path, monkeypatch):
+    path = str(tmp_path / "library.pack")
+    monkeypatch.setattr(sudoku_loader, "LIBRARY_FILE", path)
+    monkeypatch.setattr(sudoku_loader, "_library", None)
+    board = next(iter_library())[2]
+    write_library(path, {"easy": [fewer_givens(board, 1)]})
+    import_puzzles([fewer_givens(board, 2)], "easy")
+
+    call_command("precompute_traces", jobs=1, source=["puzzles"])
+    assert StoredTrace.objects.count() == 1
+    call_command("precompute_traces", jobs=1, chunk_size=2)
+    assert StoredTrace.objects.count() == 6
+    for removed in (1, 2):
+        canonical, _ = canonicalize(fewer_givens(board, removed))
+        assert stored_content(canonical) == solve_content(canonical)
+    sudoku_loader._library.close()
+
+
+def test_failed_replace_keeps_the_stored_traces(monkeypatch):
+    call_command("precompute_traces", jobs=1)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("crashed")
+
+    monkeypatch.setattr(StoredTrace.objects, "bulk_create", fail)
+    with pytest.raises(RuntimeError):
+        call_command("precompute_traces", jobs=1, force=True)
+    assert StoredTrace.objects.count() == 4
+
+
+def test_get_board_serves_stored_trace(monkeypatch):
+    call_command("precompute_traces", jobs=1)
+
+    def fail(job, board, timeout=None):
+        raise AssertionError("solved live")
+
+    monkeypatch.setattr(trace_store, "run_job", fail)
+    response = get_board(RequestFactory().get("/board/get_board/"))
+    assert json.loads(response.content)["trace"]["kinds"]
+
+
+def test_traces_are_kept_per_solver_variant(settings):
+    call_command("precompute_traces", jobs=1)
+    canonical, _ = canonicalize(next(iter_library())[2])
+    assert stored_content(canonical) is not None
+    settings.BOARD_SOLVER_CHECK_MODE = "off"
+    assert stored_content(canonical) is None
+    call_command("precompute_traces", jobs=1)
+    assert StoredTrace.objects.count() == 8
+
+
+def test_load_content_falls_back_to_solving():
+    board = next(iter_library())[2]
+    assert load_content(board) == solve_content(board)
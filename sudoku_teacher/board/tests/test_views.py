@@ -0,0 +1,288 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+from django.urls import reverse
+
+from sudoku_teacher.board.board_solver import BoardSolver
+from sudoku_teacher.board.candidates import Contradiction
+from sudoku_teacher.board.solve_cache import get_cache
+from sudoku_teacher.board.sudoku_loader import Sudoku
+from sudoku_teacher.board.trace import SolveTrace
+from sudoku_teacher.board.jobs import NO_CONTRADICTION
+from sudoku_teacher.board import solve_service, views
+from sudoku_teacher.board.asgi import StreamingASGIHandler
+from sudoku_teacher.board.budget import dumps_cursor
+from sudoku_teacher.board.executor import BoundedExecutor, SolverBusy
+from sudoku_teacher.board.solve_service import SolveCancelled, SolveTimeout
+from sudoku_teacher.board.tests.conftest import library_board
+from sudoku_teacher.board.views import (
+    get_board,
+    get_board_async,
+    iter_board_lines,
+    solve_board_async,
+    stream_board,
+    suggest_async,
+)
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("clear_cache")]
+
+
+def test_stream_board():
+    response = stream_board(RequestFactory().get("/board/stream_board/"))
+    assert response["Content-Type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in b"".join(response).splitlines()]
+
+    bs = BoardSolver(Sudoku().board)
+    with pytest.raises(Contradiction):
+        bs.solve_board()
+    assert lines[0] == {"board": bs.board}
+    assert [line["step"] for line in lines[1:-1]] == [
+        bs.trace.row(idx) for idx in range(len(bs.trace))
+    ]
+    assert lines[-1]["done"]
+    assert "contradiction" in lines[-1]
+
+
+def asgi_get(path, disconnect_after=60):
+    # the messages StreamingASGIHandler sends, for a client that goes away
+    # after disconnect_after seconds
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+    }
+    async_to_sync(StreamingASGIHandler())(scope, receive, send)
+    return messages
+
+
+def test_stream_board_under_asgi(monkeypatch):
+    threads = []
+
+    def board_lines(board):
+        threads.append(threading.current_thread().name)
+        return iter_board_lines(BoardSolver(board))
+
+    monkeypatch.setattr(views, "board_lines", board_lines)
+    messages = asgi_get("/board/stream_board/")
+    assert messages[0]["status"] == 200
+    parts = [message["body"] for message in messages[1:-1]]
+    assert messages[-1] == {"type": "http.response.body"}
+    # a message per line, sent as the solver thread makes them
+    expected = b"".join(stream_board(RequestFactory().get("/board/stream_board/")))
+    assert len(parts) == len(expected.splitlines())
+    assert b"".join(parts) == expected
+    assert threads[0].startswith("board-solver")
+
+
+def test_stream_board_replays_known_puzzles(monkeypatch):
+    request = RequestFactory().get("/board/stream_board/")
+    result = json.loads(get_board(request).content)
+
+    def fail(board):
+        raise AssertionError("solved live")
+
+    monkeypatch.setattr(views, "board_lines", fail)
+    lines = [json.loads(line) for line in b"".join(stream_board(request)).splitlines()]
+    trace = SolveTrace.from_dict(result["trace"])
+    assert lines[0] == {"board": result["board"]}
+    assert [line["step"] for line in lines[1:-1]] == [
+        trace.row(idx) for idx in range(len(trace))
+    ]
+    assert lines[-1]["contradiction"] == result["contradiction"]
+    assert async_to_sync(views.stream_board_async)(request).streaming
+
+
+def test_get_board_formats():
+    factory = RequestFactory()
+    result = json.loads(get_board(factory.get("/board/get_board/")).content)
+    assert result["board"] == Sudoku().board
+    assert "contradiction" in result
+    trace = SolveTrace.from_dict(result["trace"])
+
+    content = get_board(factory.get("/board/get_board/?format=binary")).content
+    assert list(content[:81]) == [value for row in result["board"] for value in row]
+    assert divmod(content[81], 9) == tuple(result["contradiction"])
+    assert content[81] != NO_CONTRADICTION
+    assert SolveTrace.from_bytes(content[82:]).steps == trace.steps
+
+
+def test_async_views_match_sync_views():
+    factory = RequestFactory()
+    request = factory.get("/board/get_board/")
+    expected = get_board(request).content
+    get_cache().clear()
+    assert async_to_sync(get_board_async)(request).content == expected
+    # and served from the cache
+    assert async_to_sync(get_board_async)(request).content == expected
+
+
+def test_board_urls(client):
+    response = client.get(reverse("board:get_board"))
+    assert response.status_code == 200
+    assert json.loads(response.content)["board"] == Sudoku().board
+    # steps are streamed as they are found, not after the solve
+    response = client.get(reverse("board:stream_board"))
+    assert response.streaming
+
+
+def test_metrics(client):
+    Sudoku()
+    result = json.loads(client.get(reverse("board:metrics")).content)
+    assert result["board_cache"]["hits"] + result["board_cache"]["misses"] > 0
+
+
+def test_solver_busy():
+    executor = BoundedExecutor(max_workers=1, max_pending=0)
+    with pytest.raises(SolverBusy):
+        async_to_sync(executor.run)(sum, [1, 2])
+    executor = BoundedExecutor(max_workers=1, max_pending=1)
+    assert async_to_sync(executor.run)(sum, [1, 2]) == 3
+    assert executor.pending == 0
+    executor.shutdown()
+
+
+def test_closed_iteration_stops_the_thread():
+    executor = BoundedExecutor(max_workers=1, max_pending=1)
+    produced = []
+
+    def numbers():
+        for number in range(1000):
+            produced.append(number)
+            yield number
+            time.sleep(0.01)
+
+    async def take_two():
+        items = executor.iterate(numbers)
+        taken = [await items.__anext__(), await items.__anext__()]
+        await items.aclose()
+        return taken
+
+    assert async_to_sync(take_two)() == [0, 1]
+    executor.shutdown()
+    assert len(produced) < 1000
+    assert executor.pending == 0
+
+
+def test_busy_executor_answers_503(monkeypatch):
+    monkeypatch.setattr(
+        views, "run_solver", BoundedExecutor(max_workers=1, max_pending=0).run
+    )
+    request = RequestFactory().get("/board/get_board/")
+    assert async_to_sync(views.get_board_async)(request).status_code == 503
+
+
+class FakeService:
+    def __init__(self, error=None):
+        self.error = error
+        self.cancelled = threading.Event()
+
+    def run(self, job, board, timeout=None, cancel=None):
+        if self.error is not None:
+            raise self.error
+        if cancel.wait(5):
+            self.cancelled.set()
+        raise SolveCancelled(job)
+
+
+def test_service_errors_answer_503(monkeypatch):
+    service = FakeService(SolveTimeout("solve"))
+    monkeypatch.setattr(solve_service, "get_solve_service", lambda: service)
+    request = RequestFactory().get("/board/get_board/")
+    assert async_to_sync(views.get_board_async)(request).status_code == 503
+    assert get_board(request).status_code == 503
+
+
+def test_disconnect_cancels_the_solve(monkeypatch):
+    service = FakeService()
+    monkeypatch.setattr(solve_service, "get_solve_service", lambda: service)
+    started = time.monotonic()
+    assert asgi_get("/board/get_board/", disconnect_after=0.1) == []
+    assert time.monotonic() - started < 4
+    assert service.cancelled.wait(5)
+
+
+def post_solve(data):
+    request = RequestFactory().post(
+        "/board/solve_board/", json.dumps(data), content_type="application/json"
+    )
+    return async_to_sync(solve_board_async)(request)
+
+
+def test_solve_board_in_parts():
+    board = library_board("easy", 0)
+    bs = BoardSolver(board)
+    bs.solve_board()
+
+    rows = []
+    result = json.loads(post_solve({"board": board, "max_steps": 10}).content)
+    while True:
+        assert result["offset"] == len(rows)
+        trace = SolveTrace.from_dict(result["trace"])
+        rows += [trace.row(idx) for idx in range(len(trace))]
+        if result["done"]:
+            break
+        result = json.loads(post_solve({"cursor": result["cursor"]}).content)
+    assert "contradiction" not in result
+    assert rows == [bs.trace.row(idx) for idx in range(len(bs.trace))]
+
+
+def test_solve_board_rejects_bad_input():
+    assert post_solve({"board": [[0] * 9] * 8}).status_code == 400
+    board = library_board("easy", 0)
+    assert post_solve({"board": board, "max_steps": 0}).status_code == 400
+    board = [[0] * 9 for _ in range(9)]
+    board[2][1] = board[2][7] = 5
+    response = post_solve({"board": board})
+    assert response.status_code == 400
+    assert b"(2, 1)" in response.content
+    cursor = dumps_cursor(BoardSolver(Sudoku().board).cursor())
+    assert post_solve({"cursor": "A" + cursor}).status_code == 400
+    request = RequestFactory().get("/board/solve_board/")
+    assert async_to_sync(solve_board_async)(request).status_code == 405
+
+
+def test_suggest():
+    board = library_board("easy", 0)
+    request = RequestFactory().post(
+        "/board/suggest/", json.dumps({"board": board}), content_type="application/json"
+    )
+    result = json.loads(async_to_sync(suggest_async)(request).content)
+    assert result["board"] == board
+    assert result["technique"]
+    assert len(SolveTrace.from_dict(result["trace"]))
+
+
+def test_suggest_rejects_conflicting_givens(monkeypatch):
+    def fail(*args):
+        raise AssertionError("no hint for a conflicting board")
+
+    monkeypatch.setattr(views, "hint_result", fail)
+    board = library_board("easy", 0)
+    row = board[0]
+    value = next(value for value in row if value)
+    row[row.index(0)] = value
+    request = RequestFactory().post(
+        "/board/suggest/", json.dumps({"board": board}), content_type="application/json"
+    )
+    response = async_to_sync(suggest_async)(request)
+    assert response.status_code == 400
+    assert b"repeats a value of its unit" in response.content
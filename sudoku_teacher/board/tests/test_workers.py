@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sudoku_teacher.board.workers import map_chunks, worker_pool
+
+
+def test_map_chunks_stores_in_order():
+    chunks = [(key, list(range(key))) for key in range(10)]
+    for jobs in (1, 3):
+        stored = []
+        with ThreadPoolExecutor(jobs) as executor:
+            map_chunks(
+                sum,
+                iter(chunks),
+                lambda key, total: stored.append((key, total)),
+                executor if jobs > 1 else None,
+                max_pending=2,
+            )
+        assert stored == [(key, sum(range(key))) for key in range(10)]
+
+
+def test_map_chunks_bounds_chunks_in_flight():
+    read = []
+    stored = []
+
+    def chunks():
+        for key in range(10):
+            read.append(key)
+            yield key, key
+
+    def store(key, result):
+        # chunks are read at most max_pending ahead of the ones stored
+        assert len(read) - len(stored) <= 3
+        stored.append(key)
+
+    with ThreadPoolExecutor(2) as executor:
+        map_chunks(abs, chunks(), store, executor, max_pending=3)
+    assert stored == list(range(10))
+
+
+def test_single_job_has_no_pool():
+    with worker_pool(1) as executor:
+        assert executor is None
@@ -0,0 +1,192 @@
+import struct
+import sys
+from array import array
+from typing import List, Optional
+
+from django.conf import settings
+
+from sudoku_teacher.board.board_index import CELL_POINT, UNITS, UNIT_NAMES
+from sudoku_teacher.board.candidates import bit_to_value, mask_to_values
+
+DEFAULT_MAX_STEPS = 10000
+
+# Step kinds, stored as their index in KIND_NAMES.
+INITIAL, NAKED, HIDDEN, POINTING, CLAIMING = range(5)
+KIND_NAMES = ("initial", "naked", "hidden", "pointing", "claiming")
+
+# Unit column value of steps without a unit, e.g. the neighbor of a subset.
+NO_UNIT = 255
+
+FORMAT_VERSION = 1
+# Binary form: magic, version, step count and truncated flag, then every
+# column in COLUMNS order, little endian.
+MAGIC = b"STRC"
+HEADER = struct.Struct("<4sBIB")
+COLUMNS = (
+    ("kinds", "B"),
+    ("cells", "B"),
+    ("new_options", "H"),
+    ("removed_options", "H"),
+    ("units", "B"),
+    ("neighbors", "B"),
+    ("reason_points", "H"),
+    ("reason_options", "H"),
+)
+
+
+class SolveTrace:
+    """The steps recorded by a single solve, stored column by column.
+
+    Step i is made of the i-th item of every column: its kind, the cell that
+    lost candidates, the remaining and removed candidate masks, the unit of
+    the rule and its neighbor unit, and the reason. The reason points are a
+    position mask into the rule unit, or for initial steps the given cell,
+    and the reason options a candidate mask.
+
+    Every ``BoardSolver`` owns its trace, and nothing is shared between
+    solves, so concurrent solves in threaded workers do not see each other's
+    steps. At most ``max_steps`` steps are kept; later steps are dropped and
+    ``truncated`` is set.
+    """
+
+    __slots__ = tuple(name for name, _ in COLUMNS) + ("max_steps", "truncated")
+
+    def __init__(self, max_steps: Optional[int] = None):
+        if max_steps is None:
+            max_steps = getattr(
+                settings, "BOARD_SOLVER_MAX_TRACE_STEPS", DEFAULT_MAX_STEPS
+            )
+        if max_steps < 0:
+            raise ValueError(f"max_steps must not be negative, got {max_steps}")
+        for name, typecode in COLUMNS:
+            setattr(self, name, array(typecode))
+        self.max_steps = max_steps
+        self.truncated = False
+
+    def record(
+        self,
+        kind,
+        cell,
+        new_options,
+        removed_options,
+        unit=NO_UNIT,
+        neighbor=NO_UNIT,
+        reason_points=0,
+        reason_options=0,
+    ):
+        if len(self.kinds) >= self.max_steps:
+            self.truncated = True
+            return
+        self.kinds.append(kind)
+        self.cells.append(cell)
+        self.new_options.append(new_options)
+        self.removed_options.append(removed_options)
+        self.units.append(unit)
+        self.neighbors.append(neighbor)
+        self.reason_points.append(reason_points)
+        self.reason_options.append(reason_options)
+
+    def clear(self):
+        for name, _ in COLUMNS:
+            del getattr(self, name)[:]
+        self.truncated = False
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __iter__(self):
+        return (self.step(idx) for idx in range(len(self)))
+
+    def __getitem__(self, idx):
+        return self.step(range(len(self))[idx])
+
+    @property
+    def steps(self) -> List[dict]:
+        return list(self)
+
+    def row(self, idx) -> list:
+        """Step idx as a list of its column values, in COLUMNS order."""
+        return [getattr(self, name)[idx] for name, _ in COLUMNS]
+
+    def step(self, idx) -> dict:
+        """Step idx in the verbose dict form."""
+        kind = self.kinds[idx]
+        cell = self.cells[idx]
+        new_options = self.new_options[idx]
+        removed_options = self.removed_options[idx]
+        if kind == INITIAL:
+            return {
+                "key": KIND_NAMES[kind],
+                "point": CELL_POINT[cell],
+                "new_options": list(mask_to_values(new_options)),
+                "reason_points": [list(CELL_POINT[self.reason_points[idx]])],
+                "removed_option": bit_to_value(removed_options),
+            }
+        unit = self.units[idx]
+        neighbor = self.neighbors[idx]
+        cells = UNITS[unit] if unit != NO_UNIT else ()
+        positions = self.reason_points[idx]
+        reason_points = sorted(
+            CELL_POINT[other] for pos, other in enumerate(cells) if positions >> pos & 1
+        )
+        return {
+            "key": KIND_NAMES[kind],
+            "point": CELL_POINT[cell],
+            "orig_options": mask_to_values(new_options | removed_options),
+            "new_options": mask_to_values(new_options),
+            "reason_points": reason_points,
+            "reason_options": mask_to_values(self.reason_options[idx]),
+            "rule_loc": UNIT_NAMES[unit] if unit != NO_UNIT else "",
+            "neighbor": UNIT_NAMES[neighbor] if neighbor != NO_UNIT else "",
+        }
+
+    def to_dict(self) -> dict:
+        """The JSON form, one list per column."""
+        result = {"version": FORMAT_VERSION, "truncated": self.truncated}
+        for name, _ in COLUMNS:
+            result[name] = getattr(self, name).tolist()
+        return result
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SolveTrace":
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported trace version {data.get('version')!r}")
+        trace = cls(max_steps=len(data["kinds"]))
+        for name, typecode in COLUMNS:
+            setattr(trace, name, array(typecode, data[name]))
+        trace.truncated = data["truncated"]
+        return trace
+
+    def to_bytes(self) -> bytes:
+        """The binary form, a header followed by the raw columns."""
+        chunks = [HEADER.pack(MAGIC, FORMAT_VERSION, len(self), self.truncated)]
+        for name, _ in COLUMNS:
+            column = getattr(self, name)
+            if sys.byteorder == "big":
+                column = array(column.typecode, column)
+                column.byteswap()
+            chunks.append(column.tobytes())
+        return b"".join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SolveTrace":
+        if len(data) < HEADER.size:
+            raise ValueError("truncated trace data")
+        magic, version, count, truncated = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"not a version {FORMAT_VERSION} trace")
+        trace = cls(max_steps=count)
+        offset = HEADER.size
+        for name, typecode in COLUMNS:
+            column = array(typecode)
+            size = count * column.itemsize
+            column.frombytes(data[offset : offset + size])
+            if len(column) != count:
+                raise ValueError("truncated trace data")
+            if sys.byteorder == "big":
+                column.byteswap()
+            setattr(trace, name, column)
+            offset += size
+        trace.truncated = bool(truncated)
+        return trace
+
@@ -0,0 +1,66 @@
+from typing import Dict, Iterable, Optional
+
+from django.db import transaction
+
+from sudoku_teacher.board.board_solver import SOLVER_VERSION
+from sudoku_teacher.board.models import StoredTrace
+from sudoku_teacher.board.solve_cache import puzzle_fingerprint, solver_variant
+from sudoku_teacher.board.solve_service import run_job
+
+
+def current_traces():
+    # traces solved by this solver version with the current solver settings
+    return StoredTrace.objects.filter(
+        solver_version=SOLVER_VERSION, variant=solver_variant()
+    )
+
+
+def stored_content(board) -> Optional[bytes]:
+    content = (
+        current_traces()
+        .filter(fingerprint=puzzle_fingerprint(board))
+        .values_list("content", flat=True)
+        .first()
+    )
+    return bytes(content) if content is not None else None
+
+
+def load_content(board) -> bytes:
+    """The stored content of a canonical board, solved live when unknown."""
+    content = stored_content(board)
+    if content is None:
+        content = run_job("solve", board)
+    return content
+
+
+def stored_fingerprints(fingerprints: Iterable[str]):
+    traces = current_traces().filter(fingerprint__in=list(fingerprints))
+    return set(traces.values_list("fingerprint", flat=True))
+
+
+def stored_contents(fingerprints: Iterable[str]) -> Dict[str, bytes]:
+    traces = current_traces().filter(fingerprint__in=list(fingerprints))
+    return {
+        fingerprint: bytes(content)
+        for fingerprint, content in traces.values_list("fingerprint", "content")
+    }
+
+
+def store_contents(contents: Dict[str, bytes], replace=False, batch_size=500):
+    variant = solver_variant()
+    traces = (
+        StoredTrace(
+            fingerprint=fingerprint,
+            solver_version=SOLVER_VERSION,
+            variant=variant,
+            content=content,
+        )
+        for fingerprint, content in contents.items()
+    )
+    # replaced traces are never missing from the store
+    with transaction.atomic():
+        if replace:
+            current_traces().filter(fingerprint__in=list(contents)).delete()
+        StoredTrace.objects.bulk_create(
+            traces, batch_size=batch_size, ignore_conflicts=True
+        )
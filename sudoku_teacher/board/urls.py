@@ -1,9 +1,19 @@
 from django.urls import path
 
-from sudoku_teacher.board.views import get_board
+from sudoku_teacher.board.views import (
+    get_board_async,
+    metrics,
+    solve_board_async,
+    stream_board_async,
+    suggest_async,
+)
 
 app_name = "board"
 
 urlpatterns = [
-    path("get_board/", view=get_board, name="get_board")
+    path("get_board/", view=get_board_async, name="get_board"),
+    path("stream_board/", view=stream_board_async, name="stream_board"),
+    path("solve_board/", view=solve_board_async, name="solve_board"),
+    path("suggest/", view=suggest_async, name="suggest"),
+    path("metrics/", view=metrics, name="metrics"),
 ]
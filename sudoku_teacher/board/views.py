@@ -1,20 +1,342 @@
 import json
-from django.http import JsonResponse
+from functools import partial
+from typing import List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+    StreamingHttpResponse,
+)
 
 # Create your views here.
-from sudoku_teacher.board.helper import SESSION_KEY
-from sudoku_teacher.board.sudoku_loader import Sudoku
+from sudoku_teacher.board.sudoku_loader import Sudoku, board_cache_info
+from sudoku_teacher.board.asgi import AsyncStreamingHttpResponse
+from sudoku_teacher.board.board_index import CELL_POINT, PEERS
 from sudoku_teacher.board.board_solver import BoardSolver
-from sudoku_teacher.board.helper import session
+from sudoku_teacher.board.budget import SolveBudget, dumps_cursor, loads_cursor
+from sudoku_teacher.board.candidates import Contradiction
+from sudoku_teacher.board.canonical import canonicalize
+from sudoku_teacher.board.executor import SolverBusy, iterate_solver, run_solver
+from sudoku_teacher.board.jobs import NO_CONTRADICTION
+from sudoku_teacher.board.models import Puzzle
+from sudoku_teacher.board.solve_cache import (
+    LOCK_TIMEOUT,
+    await_cached,
+    cached_solve,
+    get_cache,
+    solve_cache_key,
+)
+from sudoku_teacher.board.solve_service import SolveServiceError, run_job
+from sudoku_teacher.board.trace import SolveTrace
+from sudoku_teacher.board.trace_store import load_content, stored_content
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "binary": "application/octet-stream",
+}
+
+
+def mapped_content(content, transform):
+    # the trace and contradiction cell of a canonical board's content, mapped
+    # back onto the board transform made it from
+    inverse = transform.inverse()
+    trace = inverse.map_trace(SolveTrace.from_bytes(content[1:]))
+    contradiction = None if content[0] == NO_CONTRADICTION else inverse.cell(content[0])
+    return trace, contradiction
+
+
+def render_board(board, fmt, wait=LOCK_TIMEOUT):
+    # Equivalent puzzles share the solve of their canonical representative,
+    # which is mapped back onto board.
+    canonical, transform = canonicalize(board)
+    content = cached_solve(
+        canonical, "trace", lambda: load_content(canonical), wait=wait
+    )
+    trace, contradiction = mapped_content(content, transform)
+    if fmt == "binary":
+        # the 81 board values, the contradiction cell, then the binary trace
+        cell = NO_CONTRADICTION if contradiction is None else contradiction
+        return (
+            bytes(value for row in board for value in row)
+            + bytes((cell,))
+            + trace.to_bytes()
+        )
+    result = {"board": board}
+    if contradiction is not None:
+        result["contradiction"] = divmod(contradiction, 9)
+    result["trace"] = trace.to_dict()
+    return json.dumps(result).encode()
+
+
+def request_format(request):
+    return "binary" if request.GET.get("format") == "binary" else "json"
+
+
+def busy_response():
+    response = HttpResponse("The solver is busy, try again later.", status=503)
+    response["Retry-After"] = "1"
+    return response
+
+
+def requested_board(params):
+    # ?level= picks a random puzzle of that level, with &id= a given one, and
+    # ?random a random puzzle of any level. Without them the default puzzle.
+    level, sequence = params.get("level"), params.get("id")
+    if level is None and sequence is None and "random" not in params:
+        return Sudoku().board
+    try:
+        if sequence is not None:
+            puzzle = Puzzle.objects.by_level(level, int(sequence))
+        else:
+            puzzle = Puzzle.objects.random(level)
+    except (Puzzle.DoesNotExist, ValueError):
+        raise Http404("No such puzzle")
+    return puzzle.board
 
 
 def get_board(request):
-    b = Sudoku().board
-    bs = BoardSolver(b)
-    bs.solve_board()
-    session_update_list = session.setdefault(SESSION_KEY, list())
-    result = {"board": b, "solve_list": session_update_list}
-    return JsonResponse(result)
+    b = requested_board(request.GET)
+    fmt = request_format(request)
+    try:
+        content = cached_solve(b, fmt, partial(render_board, b, fmt))
+    except SolveServiceError:
+        return busy_response()
+    return HttpResponse(content, content_type=CONTENT_TYPES[fmt])
+
+
+# ATOMIC_REQUESTS cannot wrap async views, these only read anyway
+@transaction.non_atomic_requests
+async def get_board_async(request):
+    # Cache hits are answered right away, and a puzzle another worker is
+    # rendering is waited for on the event loop. Solves run in the solver
+    # executor so they never block the event loop, and never wait there for
+    # another worker either.
+    b = await sync_to_async(requested_board)(request.GET)
+    fmt = request_format(request)
+    content = await await_cached(b, fmt)
+    if content is None:
+        render = partial(render_board, b, fmt, wait=0)
+        try:
+            content = await run_solver(partial(cached_solve, b, fmt, render, wait=0))
+        except (SolverBusy, SolveServiceError):
+            return busy_response()
+    return HttpResponse(content, content_type=CONTENT_TYPES[fmt])
+
+
+def json_line(value) -> bytes:
+    return json.dumps(value).encode() + b"\n"
+
+
+def iter_board_lines(bs: BoardSolver):
+    yield json_line({"board": bs.board})
+    result = {"done": True}
+    sent = 0
+    try:
+        for idx in bs.iter_solve():
+            yield json_line({"step": bs.trace.row(idx)})
+            sent = idx + 1
+    except Contradiction as e:
+        result["contradiction"] = divmod(e.cell, 9)
+    # steps recorded before a contradiction was raised
+    for idx in range(sent, len(bs.trace)):
+        yield json_line({"step": bs.trace.row(idx)})
+    result["truncated"] = bs.trace.truncated
+    yield json_line(result)
+
+
+def replayed_lines(board) -> Optional[List[bytes]]:
+    """The lines of a board whose canonical board is cached or stored, the
+    same lines a live solve streams. None when it has to be solved."""
+    canonical, transform = canonicalize(board)
+    content = get_cache().get(solve_cache_key(canonical, "trace"))
+    if content is None:
+        content = stored_content(canonical)
+    if content is None:
+        return None
+    trace, contradiction = mapped_content(content, transform)
+    lines = [json_line({"board": board})]
+    lines += [json_line({"step": trace.row(idx)}) for idx in range(len(trace))]
+    result = {"done": True}
+    if contradiction is not None:
+        result["contradiction"] = divmod(contradiction, 9)
+    result["truncated"] = trace.truncated
+    lines.append(json_line(result))
+    return lines
+
+
+def board_lines(board):
+    return iter_board_lines(BoardSolver(board))
+
+
+async def chain_lines(first, rest):
+    try:
+        yield first
+        async for line in rest:
+            yield line
+    finally:
+        await rest.aclose()
+
+
+def stream_response(lines, response_class=StreamingHttpResponse):
+    response = response_class(lines, content_type="application/x-ndjson")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def stream_board(request):
+    # One JSON object per line: the board, then every step as a trace row as
+    # soon as it is found, then a closing line. Known puzzles replay their
+    # cached or stored trace, only the others are solved live.
+    board = requested_board(request.GET)
+    lines = replayed_lines(board)
+    return stream_response(board_lines(board) if lines is None else lines)
+
+
+@transaction.non_atomic_requests
+async def stream_board_async(request):
+    # Under the handler of config.asgi the lines of a live solve are made in
+    # the solver executor and sent as they come. Other handlers iterate
+    # streaming content synchronously, they get the sync view.
+    if not getattr(request, "async_streaming", False):
+        return await sync_to_async(stream_board)(request)
+    board = await sync_to_async(requested_board)(request.GET)
+    lines = await sync_to_async(replayed_lines)(board)
+    if lines is not None:
+        return stream_response(lines)
+    lines = iterate_solver(board_lines, board)
+    try:
+        # the first line takes the solver slot
+        first = await lines.__anext__()
+    except SolverBusy:
+        return busy_response()
+    return stream_response(chain_lines(first, lines), AsyncStreamingHttpResponse)
+
+
+def parse_board(value):
+    if (
+        not isinstance(value, list)
+        or len(value) != 9
+        or not all(isinstance(row, list) and len(row) == 9 for row in value)
+        or not all(
+            type(cell) is int and 0 <= cell <= 9 for row in value for cell in row
+        )
+    ):
+        raise ValueError("a board is 9 rows of 9 values from 0 to 9")
+    # a given repeated in a unit only leads to a misleading partial solve
+    cells = [cell for row in value for cell in row]
+    for cell, given in enumerate(cells):
+        if given and any(cells[peer] == given for peer in PEERS[cell]):
+            raise ValueError(
+                f"the given at {CELL_POINT[cell]} repeats a value of its unit"
+            )
+    return value
+
+
+def parse_limit(data, name):
+    value = data.get(name)
+    if value is not None and (type(value) is not int or value < 1):
+        raise ValueError(f"{name} must be a positive integer")
+    return value
+
+
+def parse_budget(data):
+    # The server's budget bounds the latency of every call, clients can only
+    # ask for less.
+    seconds = getattr(settings, "BOARD_SOLVER_BUDGET_SECONDS", 0.25)
+    max_seconds = data.get("max_seconds")
+    if max_seconds is not None:
+        if type(max_seconds) not in (int, float) or max_seconds <= 0:
+            raise ValueError("max_seconds must be a positive number")
+        seconds = min(seconds, max_seconds)
+    return SolveBudget.within(
+        seconds,
+        max_steps=parse_limit(data, "max_steps"),
+        max_eliminations=parse_limit(data, "max_eliminations"),
+    )
+
+
+def budgeted_solve(board, cursor, budget: SolveBudget) -> dict:
+    bs = BoardSolver.resume(cursor) if cursor is not None else BoardSolver(board)
+    result = {"board": bs.board, "offset": bs.trace_offset}
+    try:
+        cursor = bs.solve_within(budget)
+    except Contradiction as e:
+        cursor = None
+        result["contradiction"] = divmod(e.cell, 9)
+    result["trace"] = bs.trace.to_dict()
+    result["done"] = cursor is None
+    result["cursor"] = dumps_cursor(cursor) if cursor is not None else None
+    return result
+
+
+@transaction.non_atomic_requests
+async def solve_board_async(request):
+    # Solves a posted board within a time budget. Unfinished solves answer
+    # with their steps so far, starting at offset in the whole trace, and a
+    # cursor to post back for the next ones.
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    try:
+        data = json.loads(request.body)
+        if not isinstance(data, dict):
+            raise ValueError("expected a JSON object")
+        budget = parse_budget(data)
+        if data.get("cursor") is not None:
+            board, cursor = None, loads_cursor(data["cursor"])
+        else:
+            board, cursor = parse_board(data.get("board")), None
+    except (TypeError, ValueError) as e:
+        return HttpResponseBadRequest(str(e))
+    try:
+        result = await run_solver(budgeted_solve, board, cursor, budget)
+    except SolverBusy:
+        return busy_response()
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    return HttpResponse(json.dumps(result), content_type=CONTENT_TYPES["json"])
+
+
+def hint_result(board) -> dict:
+    result = {"board": board, "technique": None, "trace": None}
+    try:
+        hint = run_job("hint", board)
+    except Contradiction as e:
+        result["contradiction"] = divmod(e.cell, 9)
+        return result
+    if hint is not None:
+        technique, trace = hint
+        result["technique"] = technique
+        result["trace"] = SolveTrace.from_bytes(trace).to_dict()
+    return result
+
 
+@transaction.non_atomic_requests
+async def suggest_async(request):
+    # The next step of a posted board, found by the cheapest technique that
+    # finds one, without solving the rest of the board.
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    try:
+        data = json.loads(request.body)
+        if not isinstance(data, dict):
+            raise ValueError("expected a JSON object")
+        board = parse_board(data.get("board"))
+    except (TypeError, ValueError) as e:
+        return HttpResponseBadRequest(str(e))
+    try:
+        result = await run_solver(hint_result, board)
+    except (SolverBusy, SolveServiceError):
+        return busy_response()
+    return HttpResponse(json.dumps(result), content_type=CONTENT_TYPES["json"])
 
 
+def metrics(request):
+    # Counters of this worker process, for monitoring.
+    result = {"board_cache": board_cache_info()._asdict()}
+    return HttpResponse(json.dumps(result), content_type=CONTENT_TYPES["json"])
@@ -0,0 +1,65 @@
+import collections
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+import django
+
+
+def add_jobs_argument(parser, help: str):
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help=help)
+
+
+@contextmanager
+def worker_pool(jobs: int) -> Iterator[Optional[Executor]]:
+    """A pool of jobs worker processes with Django set up, None for one job,
+    which then runs in this process."""
+    if jobs <= 1:
+        yield None
+        return
+    executor = ProcessPoolExecutor(jobs, initializer=django.setup)
+    try:
+        yield executor
+    finally:
+        executor.shutdown()
+
+
+def imap_chunks(
+    func: Callable[[Any], Any],
+    chunks: Iterable[Tuple[Any, Any]],
+    executor: Optional[Executor] = None,
+    max_pending=2,
+) -> Iterator[Tuple[Any, Any]]:
+    """Yield ``(key, func(data))`` for every ``(key, data)`` of chunks, in
+    order.
+
+    ``func`` runs in ``executor`` when given, with at most ``max_pending``
+    chunks in flight so memory stays bounded, and every chunk is yielded as
+    soon as it and the ones before it are done.
+    """
+    if executor is None:
+        for key, data in chunks:
+            yield key, func(data)
+        return
+    pending = collections.deque()
+    for key, data in chunks:
+        pending.append((key, executor.submit(func, data)))
+        while len(pending) >= max_pending:
+            key, future = pending.popleft()
+            yield key, future.result()
+    while pending:
+        key, future = pending.popleft()
+        yield key, future.result()
+
+
+def map_chunks(
+    func: Callable[[Any], Any],
+    chunks: Iterable[Tuple[Any, Any]],
+    store: Callable[[Any, Any], None],
+    executor: Optional[Executor] = None,
+    max_pending=2,
+):
+    """Call ``store(key, result)`` for every chunk of ``imap_chunks``."""
+    for key, result in imap_chunks(func, chunks, executor, max_pending):
+        store(key, result)
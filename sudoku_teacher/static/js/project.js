@@ -161,13 +161,176 @@ document.addEventListener("DOMContentLoaded", function () {
         update_board(json)
     }
 
+    async function stream_for_django(selector, on_message) {
+        // Reads a response of one JSON object per line, handing every line
+        // to on_message as soon as it arrives.
+        const data_url = document.querySelector(selector).attributes['data-stream-url']
+        const url = new URL(stripTrailingSlash(data_url.baseURI) + data_url.value)
+        const response = await fetch(url, {mode: 'same-origin'})
+        const reader = response.body.getReader()
+        const decoder = new TextDecoder()
+        let buffer = ""
+        while (true) {
+            const {done, value} = await reader.read()
+            if (done) {
+                break
+            }
+            buffer += decoder.decode(value, {stream: true})
+            const lines = buffer.split("\n")
+            buffer = lines.pop()
+            for (const line of lines) {
+                if (line) {
+                    on_message(JSON.parse(line))
+                }
+            }
+        }
+        if (buffer) {
+            on_message(JSON.parse(buffer))
+        }
+    }
+
     document.querySelector("#load-btn").onclick = async function () {
-        await fetch_for_django("#load-btn");
+        await stream_for_django("#load-btn", (message) => {
+            if (message['board']) {
+                update_board(message)
+            } else if (message['step']) {
+                console.log(decode_step(message['step']))
+            } else {
+                console.log(message)
+            }
+        });
+    }
+
+
+    // Solve traces come as parallel columns, see board/trace.py
+    const TRACE_KINDS = ["initial", "naked", "hidden", "pointing", "claiming"]
+    const TRACE_COLUMNS = [
+        ["kinds", Uint8Array],
+        ["cells", Uint8Array],
+        ["new_options", Uint16Array],
+        ["removed_options", Uint16Array],
+        ["units", Uint8Array],
+        ["neighbors", Uint8Array],
+        ["reason_points", Uint16Array],
+        ["reason_options", Uint16Array],
+    ]
+    const NO_UNIT = 255
+
+    const unit_cells = (unit) => {
+        const cells = []
+        for (let pos = 0; pos < 9; pos++) {
+            if (unit < 9) {
+                cells.push(unit * 9 + pos)
+            } else if (unit < 18) {
+                cells.push(pos * 9 + unit - 9)
+            } else {
+                const square = unit - 18
+                const row = Math.floor(square / 3) * 3 + Math.floor(pos / 3)
+                const col = (square % 3) * 3 + pos % 3
+                cells.push(row * 9 + col)
+            }
+        }
+        return cells
+    }
+
+    const unit_name = (unit) => {
+        if (unit === NO_UNIT) {
+            return ""
+        } else if (unit < 9) {
+            return `row-${unit}`
+        } else if (unit < 18) {
+            return `col-${unit - 9}`
+        }
+        const square = unit - 18
+        return `square-${Math.floor(square / 3) * 3}-${(square % 3) * 3}`
     }
 
+    const cell_point = (cell) => [Math.floor(cell / 9), cell % 9]
+
+    const mask_to_values = (mask) => {
+        const values = []
+        for (let value = 1; value <= 9; value++) {
+            if (mask & (1 << (value - 1))) {
+                values.push(value)
+            }
+        }
+        return values
+    }
+
+    const decode_binary_trace = (buffer, offset = 0) => {
+        const view = new DataView(buffer, offset)
+        const magic = String.fromCharCode(...new Uint8Array(buffer, offset, 4))
+        if (magic !== "STRC" || view.getUint8(4) !== 1) {
+            throw new Error("not a version 1 trace")
+        }
+        const count = view.getUint32(5, true)
+        const trace = {version: 1, truncated: view.getUint8(9) === 1}
+        let position = 10
+        for (const [name, type] of TRACE_COLUMNS) {
+            const column = []
+            for (let i = 0; i < count; i++) {
+                column.push(type === Uint8Array ?
+                    view.getUint8(position + i) :
+                    view.getUint16(position + i * 2, true))
+            }
+            trace[name] = column
+            position += count * type.BYTES_PER_ELEMENT
+        }
+        return trace
+    }
+
+    const decode_trace = (trace) => {
+        const steps = []
+        for (let i = 0; i < trace.kinds.length; i++) {
+            const kind = trace.kinds[i]
+            const new_options = trace.new_options[i]
+            const removed_options = trace.removed_options[i]
+            const point = cell_point(trace.cells[i])
+            if (TRACE_KINDS[kind] === "initial") {
+                steps.push({
+                    key: "initial",
+                    point: point,
+                    new_options: mask_to_values(new_options),
+                    reason_points: [cell_point(trace.reason_points[i])],
+                    removed_option: mask_to_values(removed_options)[0],
+                })
+                continue
+            }
+            const unit = trace.units[i]
+            const cells = unit === NO_UNIT ? [] : unit_cells(unit)
+            const reason_points = cells
+                .filter((cell, pos) => trace.reason_points[i] & (1 << pos))
+                .sort((a, b) => a - b)
+                .map(cell_point)
+            steps.push({
+                key: TRACE_KINDS[kind],
+                point: point,
+                orig_options: mask_to_values(new_options | removed_options),
+                new_options: mask_to_values(new_options),
+                reason_points: reason_points,
+                reason_options: mask_to_values(trace.reason_options[i]),
+                rule_loc: unit_name(unit),
+                neighbor: unit_name(trace.neighbors[i]),
+            })
+        }
+        return steps
+    }
+    const decode_step = (row) => {
+        const trace = {}
+        TRACE_COLUMNS.forEach(([name], i) => {
+            trace[name] = [row[i]]
+        })
+        return decode_trace(trace)[0]
+    }
+
+    window.decode_trace = decode_trace
+    window.decode_binary_trace = decode_binary_trace
 
     const update_board = (message) => {
         console.log(message)
+        if (message['trace']) {
+            console.log(decode_trace(message['trace']))
+        }
 
         const board = message['board']
         const id = message["id"]